@@ -1,52 +1,358 @@
-from flask import Flask, request, jsonify
-from playwright.sync_api import sync_playwright
+from flask import Flask, Response, request
+from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 import json
 import threading
 import time
 import subprocess
 import psutil
 import re
-from typing import List, Dict, Optional, Tuple
+import queue
+import logging
+import sys
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import List, Dict, NamedTuple, Optional, Tuple
 
 app = Flask(__name__)
 
+logger = logging.getLogger(__name__)
+
+# How long a check_running_browsers() scan stays valid (seconds)
+BROWSERS_CACHE_TTL = 30.0
+
+DEBUG_PORT_RE = re.compile(r'--remote-debugging-port')
+
+# Where cookie consent buttons usually live; scanned first when processing a page
+CONSENT_BUTTON_SELECTORS = [
+    '.accept',
+    '.agree',
+    '[id*="cookie"] button',
+    '[class*="cookie"] button',
+    '[id*="consent"] button',
+    '[class*="consent"] button'
+]
+
+# Enhanced selectors for different types of buttons
+BUTTON_SELECTORS = [
+    # Standard buttons
+    'button',
+    'input[type="button"]',
+    'input[type="submit"]',
+    'input[type="reset"]',
+    
+    # Links that act as buttons
+    'a[role="button"]',
+    'div[role="button"]',
+    'span[role="button"]',
+    
+    # Common clickable elements ([onclick] also covers a[onclick])
+    '[onclick]',
+    '.btn',
+    '.button',
+    '.click',
+    '.submit',
+    '.send',
+    '.next',
+    '.continue',
+    '.confirm',
+    '.ok',
+    '.yes',
+    '.no',
+    '.cancel',
+    '.close',
+    '.dismiss',
+    '.skip'
+]
+
+INPUT_SELECTORS = [
+    'input[type="text"]', 'input[type="email"]', 'input[type="password"]',
+    'input[type="search"]', 'input[type="url"]', 'input[type="tel"]',
+    'input[type="number"]', 'input:not([type])', 'textarea',
+    'input[type="date"]', 'input[type="time"]'
+]
+
+# Joined selectors let the browser match everything in a single DOM walk.
+# Consent selectors ending in ' button' are left out of the full selector:
+# plain 'button' already matches everything they do.
+BUTTON_SELECTOR = ', '.join(
+    [selector for selector in CONSENT_BUTTON_SELECTORS if not selector.endswith(' button')]
+    + BUTTON_SELECTORS
+)
+INPUT_SELECTOR = ', '.join(INPUT_SELECTORS)
+
+# The consent tier is cheap and usually enough; the full selector (minus what
+# the first tier already returned) is only scanned when it is not
+BUTTON_SELECTOR_TIERS = [', '.join(CONSENT_BUTTON_SELECTORS), BUTTON_SELECTOR]
+
+# Cookie consent buttons (highest priority for user experience)
+COOKIE_PATTERNS = (
+    'accept all', 'accept cookies', 'allow all', 'allow cookies',
+    'agree and continue', 'accept and continue', 'cookie', 'consent',
+    'i accept', 'i agree', 'موافق على الكوكيز', 'قبول الكوكيز', 'موافق',
+)
+
+# Terms and conditions
+TERMS_PATTERNS = (
+    'accept terms', 'agree terms', 'accept conditions', 'agree conditions',
+    'i agree to terms', 'accept privacy', 'موافق على الشروط', 'قبول الشروط',
+    'terms', 'privacy policy', 'موافقة على الشروط',
+)
+
+# Navigation buttons
+NAVIGATION_PATTERNS = (
+    'next', 'continue', 'proceed', 'forward', 'التالي', 'متابعة', 'المتابعة',
+)
+
+# Search buttons
+SEARCH_PATTERNS = (
+    'search', 'find', 'بحث', 'البحث',
+)
+
+# Cancel/Close buttons
+CANCEL_PATTERNS = (
+    'cancel', 'close', 'dismiss', 'skip', 'not now', 'later',
+    'إلغاء', 'إغلاق', 'تجاهل', 'لاحقاً', 'ليس الآن',
+)
+
+# Choice buttons (Yes/No, etc.)
+CHOICE_PATTERNS = (
+    'yes', 'no', 'ok', 'confirm', 'نعم', 'لا', 'موافق', 'تأكيد',
+)
+
+# (priority, category, description prefix, patterns), highest priority first
+_CATEGORY_TABLE = (
+    (10, 'cookie_consent', "Cookie Consent Button", COOKIE_PATTERNS),
+    (9, 'terms_agreement', "Terms Agreement Button", TERMS_PATTERNS),
+    (7, 'navigation', "Navigation Button", NAVIGATION_PATTERNS),
+    (6, 'search', "Search Button", SEARCH_PATTERNS),
+    (5, 'choice', "Choice Button", CHOICE_PATTERNS),
+    (2, 'cancel', "Cancel/Close Button", CANCEL_PATTERNS),
+)
+
+# category -> (priority, description prefix)
+BUTTON_CATEGORIES = {category: (priority, prefix) for priority, category, prefix, _ in _CATEGORY_TABLE}
+
+# category -> patterns, in table order (the description names the first one present)
+BUTTON_CATEGORY_PATTERNS = {category: patterns for _, category, _, patterns in _CATEGORY_TABLE}
+
+# All patterns compiled into a single alternation so each button's text is
+# scanned once. The lookahead makes every position a candidate, and at each
+# position the alternatives are tried in priority order.
+BUTTON_PATTERN_RE = re.compile('(?=' + '|'.join(
+    f"(?P<{category}>{'|'.join(map(re.escape, patterns))})"
+    for _, category, _, patterns in _CATEGORY_TABLE
+) + ')')
+
+# Buttons that never lead anywhere; process_all_buttons clicks these in batches
+BATCH_CLICK_CATEGORIES = {'cookie_consent', 'terms_agreement', 'cancel'}
+
+# In-page helpers shared by the scripts below. Visibility is decided from
+# one bounding box + computed style instead of is_visible()/is_enabled() CDP calls.
+JS_HELPERS = """
+    // Cheapest test first; one rect and one computed style per element
+    const isVisible = el => {
+        if (el.disabled) return false;
+        const rect = el.getBoundingClientRect();
+        if (rect.width <= 0 || rect.height <= 0) return false;
+        const style = getComputedStyle(el);
+        return style.visibility !== 'hidden' && style.display !== 'none';
+    };
+    const findAssociatedInput = el => {
+        if (!el.parentElement) return null;
+        for (const inp of el.parentElement.querySelectorAll('input, textarea')) {
+            const type = inp.getAttribute('type') || 'text';
+            if (['text', 'search', 'email', 'url'].includes(type) && isVisible(inp)) return inp;
+        }
+        return null;
+    };
+"""
+
+# Runs in the page: reads every attribute we need in one round-trip instead of
+# one CDP call per attribute per element. It receives the query_selector_all
+# handles themselves, so `index` points at exactly the element that was read.
+BUTTON_INFO_JS = """([elements, seenKeys]) => {""" + JS_HELPERS + """
+    const buttons = [];
+    // Identical buttons (same tag, class and text) are reported once. The key is
+    // built from textContent, which unlike innerText does not force a layout, and
+    // is checked before any other read. seenKeys carries keys from earlier tiers.
+    const seen = new Set(seenKeys);
+    // All layout reads happen in this first pass, so the page lays out once
+    // and the innerText reads below hit the same up-to-date layout.
+    const visible = [];
+    elements.forEach((el, index) => {
+        const key = JSON.stringify([el.tagName, el.getAttribute('class'), el.textContent.trim()]);
+        if (seen.has(key) || !isVisible(el)) return;
+        seen.add(key);
+        visible.push([el, index, key, findAssociatedInput(el)]);
+    });
+    for (const [el, index, key, input] of visible) {
+        buttons.push({
+            index,
+            key,
+            tag_name: el.tagName.toLowerCase(),
+            text: el.innerText || '',
+            class: el.getAttribute('class') || '',
+            id: el.getAttribute('id') || '',
+            title: el.getAttribute('title') || '',
+            aria_label: el.getAttribute('aria-label') || '',
+            onclick: el.getAttribute('onclick') || '',
+            role: el.getAttribute('role') || '',
+            type: el.getAttribute('type') || '',
+            associated_input: input && {
+                type: input.getAttribute('type') || 'text',
+                placeholder: input.getAttribute('placeholder') || '',
+                value: input.value
+            }
+        });
+    }
+    return buttons;
+}"""
+
+INPUT_INFO_JS = """elements => {""" + JS_HELPERS + """
+    const fields = [];
+    elements.forEach((el, index) => {
+        if (!isVisible(el)) return;
+        fields.push({
+            index,
+            tag_name: el.tagName.toLowerCase(),
+            placeholder: el.getAttribute('placeholder') || '',
+            name: el.getAttribute('name') || '',
+            id: el.getAttribute('id') || '',
+            class: el.getAttribute('class') || '',
+            type: el.getAttribute('type') || ''
+        });
+    });
+    return fields;
+}"""
+
+ASSOCIATED_INPUT_JS = """el => {""" + JS_HELPERS + """
+    return findAssociatedInput(el);
+}"""
+
+# Clicks a batch in order and reports, per element, whether it was clicked.
+# Elements that an earlier click detached or hid (e.g. the rest of a cookie
+# banner) are skipped, so they are reported instead of clicked blindly.
+BATCH_CLICK_JS = """elements => {""" + JS_HELPERS + """
+    return elements.map(el => {
+        if (!el.isConnected || !isVisible(el)) return false;
+        el.click();
+        return true;
+    });
+}"""
+
+# True once the field's value has not changed for 3 seconds. The state lives on
+# the element so it survives between polls of wait_for_function. It is tagged
+# with the check it belongs to, so a check that timed out cannot leak into the
+# next one, and it is removed once the value has settled.
+TYPING_SETTLED_JS = """([el, check]) => {
+    const now = performance.now();
+    const state = el.__typingState;
+    if (!state || state.check !== check || state.value !== el.value) {
+        el.__typingState = { check, value: el.value, since: now };
+        return false;
+    }
+    if (now - state.since < 3000) return false;
+    delete el.__typingState;
+    return true;
+}"""
+
+class ClickResult(NamedTuple):
+    """Outcome of one click; kept as a tuple until the response is built"""
+    success: bool
+    message: str
+    category: str
+    button_text: Optional[str] = None
+    
+    def to_dict(self) -> Dict:
+        result = {"success": self.success, "message": self.message, "category": self.category}
+        if self.button_text is not None:
+            result["button_text"] = self.button_text
+        return result
+
 class SmartButtonAutomation:
-    def __init__(self):
+    BROWSERS_INFO = [
+        {"name": "Chrome", "process_names": ["chrome.exe", "chrome", "google-chrome", "google chrome"], "debug_port": 9222},
+        {"name": "Edge", "process_names": ["msedge.exe", "msedge", "microsoft-edge", "microsoft edge"], "debug_port": 9222},
+        {"name": "Firefox", "process_names": ["firefox.exe", "firefox"], "debug_port": 6000}
+    ]
+    
+    # Lowercase process name -> browser, so each process costs one dict lookup
+    NAME_TO_BROWSER = {name.lower(): browser for browser in BROWSERS_INFO for name in browser['process_names']}
+    
+    def __init__(self, use_existing_page: bool = True):
+        self.use_existing_page = use_existing_page  # False: open a dedicated tab on connect
         self.playwright = None
         self.browser = None
         self.page = None
+        self.owns_page = False  # True when self.page is a tab we opened, closed on disconnect
         self.current_session = None
         self.browser_type = None
         self.typing_in_progress = False
         self.last_typing_time = 0
+        self._browsers_cache = None
+        self._browsers_cache_time = 0.0
+        # The sync Playwright API only works on the thread that started it, so all
+        # browser work runs on this one long-lived thread (see run())
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='playwright')
+    
+    def run(self, func, *args, **kwargs):
+        """Run func on the Playwright thread and return its result"""
+        return self._executor.submit(func, *args, **kwargs).result()
+    
+    def get_playwright(self):
+        """Start the Playwright driver once and keep it for the process lifetime"""
+        if self.playwright is None:
+            self.playwright = sync_playwright().start()
+        return self.playwright
+    
+    def stop_playwright(self):
+        """Disconnect and stop the Playwright driver; get_playwright() starts a new one"""
+        self.close_browser_connection()
+        if self.playwright:
+            self.playwright.stop()
+            self.playwright = None
+    
+    def shutdown(self):
+        """Disconnect and stop the Playwright driver (on process exit)"""
+        self.run(self.stop_playwright)
+        self._executor.shutdown()
         
     def check_running_browsers(self):
         """Check if any supported browsers are running with debug port"""
-        browsers_info = [
-            {"name": "Chrome", "process_names": ["chrome.exe", "chrome", "google-chrome"], "debug_port": 9222},
-            {"name": "Edge", "process_names": ["msedge.exe", "msedge", "microsoft-edge"], "debug_port": 9222},
-            {"name": "Firefox", "process_names": ["firefox.exe", "firefox"], "debug_port": 6000}
-        ]
+        # The process table rarely changes between calls, so reuse a recent scan
+        now = time.monotonic()
+        if self._browsers_cache is not None and now - self._browsers_cache_time < BROWSERS_CACHE_TTL:
+            return self._browsers_cache
         
-        running_browsers = []
+        found = []
         
-        for browser in browsers_info:
-            for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-                try:
-                    if proc.info['name'] and any(name.lower() in proc.info['name'].lower() for name in browser['process_names']):
-                        cmdline = proc.info.get('cmdline', [])
-                        if cmdline and any('--remote-debugging-port' in str(arg) for arg in cmdline):
-                            running_browsers.append(browser)
-                            break
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        # Walk the process table once, fetching only the cheap 'name' attribute;
+        # cmdline is read only for processes that are a known browser
+        for proc in psutil.process_iter(['name']):
+            try:
+                proc_name = proc.info['name']
+                if not proc_name:
+                    continue
+                browser = self.NAME_TO_BROWSER.get(proc_name.lower())
+                if browser is None or browser in found:
                     continue
+                if DEBUG_PORT_RE.search(' '.join(proc.cmdline())):
+                    found.append(browser)
+                    if len(found) == len(self.BROWSERS_INFO):
+                        break
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
         
+        running_browsers = [browser for browser in self.BROWSERS_INFO if browser in found]
+        self._browsers_cache = running_browsers
+        self._browsers_cache_time = now
         return running_browsers
     
     def connect_to_existing_browser(self):
         """Try to connect to an existing browser with debugging enabled"""
         try:
-            self.playwright = sync_playwright().start()
+            self.get_playwright()
             
             # Try Chrome/Edge first (they use the same CDP protocol)
             cdp_ports = [9222, 9223, 9224]  # Common debug ports
@@ -59,15 +365,18 @@ class SmartButtonAutomation:
                         contexts = self.browser.contexts
                         if contexts:
                             pages = contexts[0].pages
-                            if pages:
+                            if pages and self.use_existing_page:
                                 self.page = pages[0]
+                                self.owns_page = False
                             else:
                                 self.page = contexts[0].new_page()
+                                self.owns_page = True
                         else:
                             context = self.browser.new_context()
                             self.page = context.new_page()
+                            self.owns_page = True
                         
-                        print(f"✅ Successfully connected to existing browser on port {port}")
+                        logger.info("✅ Successfully connected to existing browser on port %s", port)
                         return True
                         
                 except Exception as e:
@@ -81,15 +390,18 @@ class SmartButtonAutomation:
                     contexts = self.browser.contexts
                     if contexts:
                         pages = contexts[0].pages
-                        if pages:
+                        if pages and self.use_existing_page:
                             self.page = pages[0]
+                            self.owns_page = False
                         else:
                             self.page = contexts[0].new_page()
+                            self.owns_page = True
                     else:
                         context = self.browser.new_context()
                         self.page = context.new_page()
+                        self.owns_page = True
                     
-                    print("✅ Successfully connected to existing Firefox browser")
+                    logger.info("✅ Successfully connected to existing Firefox browser")
                     return True
                     
             except Exception as e:
@@ -98,26 +410,33 @@ class SmartButtonAutomation:
             return False
             
         except Exception as e:
-            print(f"❌ Error connecting to browser: {e}")
+            logger.error("❌ Error connecting to browser: %s", e)
             return False
     
     def start_browser_connection(self):
         """Try to connect to existing browser or show instructions"""
-        print("🔍 Checking for running browsers with debug mode...")
+        logger.info("🔍 Checking for running browsers with debug mode...")
         
         if self.connect_to_existing_browser():
             return True
         
-        print("\n❌ No browser found with debugging enabled!")
-        print("\n📋 Please start one of the following browsers with debug mode:")
-        print("\n🌐 For Chrome:")
-        print("   Windows: chrome.exe --remote-debugging-port=9222")
-        print("   Mac/Linux: google-chrome --remote-debugging-port=9222")
-        print("\n🌐 For Edge:")
-        print("   Windows: msedge.exe --remote-debugging-port=9222")
-        print("   Mac/Linux: microsoft-edge --remote-debugging-port=9222")
-        print("\n⚠️  Then restart this application.")
-        print("-" * 60)
+        # Only on failure, and cached for BROWSERS_CACHE_TTL, so retries stay cheap
+        for browser in self.check_running_browsers():
+            logger.warning("⚠️  %s is running with --remote-debugging-port, but no debug port accepted the connection",
+                           browser['name'])
+        
+        logger.warning(
+            "\n❌ No browser found with debugging enabled!"
+            "\n\n📋 Please start one of the following browsers with debug mode:"
+            "\n\n🌐 For Chrome:"
+            "\n   Windows: chrome.exe --remote-debugging-port=9222"
+            "\n   Mac/Linux: google-chrome --remote-debugging-port=9222"
+            "\n\n🌐 For Edge:"
+            "\n   Windows: msedge.exe --remote-debugging-port=9222"
+            "\n   Mac/Linux: microsoft-edge --remote-debugging-port=9222"
+            "\n\n⚠️  Then restart this application."
+            "\n" + "-" * 60
+        )
         
         return False
     
@@ -125,112 +444,81 @@ class SmartButtonAutomation:
         """Close the browser connection (not the browser itself)"""
         try:
             if self.browser:
-                print("🔌 Disconnecting from browser...")
+                logger.info("🔌 Disconnecting from browser...")
+                browser = self.browser
+                page = self.page if self.owns_page else None
                 self.browser = None
                 self.page = None
+                self.owns_page = False
+                # Tabs opened for this slot would otherwise stay open in the user's browser
+                if page is not None and not page.is_closed():
+                    page.close()
+                # Drops the CDP connection; Playwright itself stays running for the next session
+                browser.close()
                 
-            if self.playwright:
-                self.playwright.stop()
-                self.playwright = None
-                
-            print("✅ Browser connection closed successfully")
+            logger.info("✅ Browser connection closed successfully")
             return True
             
         except Exception as e:
-            print(f"❌ Error closing browser connection: {e}")
+            logger.error("❌ Error closing browser connection: %s", e)
             return False
     
     def navigate_to_url(self, url):
         """Navigate to the requested URL"""
         try:
-            print(f"🌐 Navigating to: {url}")
-            self.page.goto(url, wait_until='networkidle', timeout=30000)
-            print("✅ Page loaded successfully")
+            logger.debug("🌐 Navigating to: %s", url)
+            self.page.goto(url, wait_until='domcontentloaded', timeout=10000)
+            logger.debug("✅ Page loaded successfully")
             return True
         except Exception as e:
-            print(f"❌ Error loading page: {e}")
+            logger.error("❌ Error loading page: %s", e)
             return False
     
     def find_all_buttons(self) -> List[Dict]:
         """Find all clickable buttons on the page with smart categorization"""
+        return self.scan_selector(BUTTON_SELECTOR, [])
+    
+    def iter_buttons(self):
+        """Yield the buttons of each selector tier in turn, so callers can stop scanning early"""
+        seen_keys = []
+        for selector in BUTTON_SELECTOR_TIERS:
+            yield self.scan_selector(selector, seen_keys)
+    
+    def scan_selector(self, selector: str, seen_keys: List[str]) -> List[Dict]:
+        """Analyze the visible buttons matching one joined selector, skipping seen_keys"""
         buttons = []
         
-        # Enhanced selectors for different types of buttons
-        button_selectors = [
-            # Standard buttons
-            'button',
-            'input[type="button"]',
-            'input[type="submit"]',
-            'input[type="reset"]',
-            
-            # Links that act as buttons
-            'a[role="button"]',
-            'a[onclick]',
-            'div[role="button"]',
-            'span[role="button"]',
-            
-            # Common clickable elements
-            '[onclick]',
-            '.btn',
-            '.button',
-            '.click',
-            '.submit',
-            '.send',
-            '.next',
-            '.continue',
-            '.accept',
-            '.agree',
-            '.confirm',
-            '.ok',
-            '.yes',
-            '.no',
-            '.cancel',
-            '.close',
-            '.dismiss',
-            '.skip'
-        ]
-        
-        found_elements = set()
-        
-        for selector in button_selectors:
-            try:
-                elements = self.page.query_selector_all(selector)
-                for element in elements:
-                    if element and element.is_visible() and element.is_enabled():
-                        # Avoid duplicates
-                        element_hash = f"{element.tag_name}-{element.get_attribute('class')}-{element.inner_text()}"
-                        if element_hash not in found_elements:
-                            found_elements.add(element_hash)
-                            button_info = self.analyze_button(element)
-                            if button_info:
-                                buttons.append(button_info)
-            except Exception as e:
-                print(f"❌ Error searching for buttons with selector {selector}: {e}")
-                continue
+        try:
+            # One joined query: the browser walks the DOM once and returns each node once
+            elements = self.page.query_selector_all(selector)
+            # Read the same handles that will be clicked, not a second query that
+            # could see a DOM changed in between
+            elements_info = self.page.evaluate(BUTTON_INFO_JS, [elements, seen_keys])
+        except Exception as e:
+            logger.error("❌ Error searching for buttons: %s", e)
+            return buttons
+        
+        for info in elements_info:
+            seen_keys.append(info['key'])
+            button_info = self.analyze_button(elements[info['index']], info)
+            if button_info:
+                buttons.append(button_info)
         
         return buttons
     
-    def analyze_button(self, element) -> Optional[Dict]:
+    def analyze_button(self, element, info: Dict) -> Optional[Dict]:
         """Analyze button characteristics and determine its type and priority"""
         try:
-            # Get button text and attributes
-            text = element.inner_text().strip().lower()
-            onclick = element.get_attribute('onclick') or ""
-            class_name = element.get_attribute('class') or ""
-            id_attr = element.get_attribute('id') or ""
-            title = element.get_attribute('title') or ""
-            aria_label = element.get_attribute('aria-label') or ""
-            role = element.get_attribute('role') or ""
-            type_attr = element.get_attribute('type') or ""
+            # Button text and attributes were read in-page by BUTTON_INFO_JS
+            text = info['text'].strip().lower()
+            type_attr = info['type']
+            tag_name = info['tag_name']
             
             # Combine all text sources for analysis
-            combined_text = f"{text} {class_name} {id_attr} {title} {aria_label} {onclick}".lower()
+            combined_text = f"{text} {info['class']} {info['id']} {info['title']} {info['aria_label']} {info['onclick']}".lower()
             
             # Determine button category and priority
-            category, priority, description = self.categorize_button(combined_text, type_attr, element.tag_name.lower())
-            
-            # Check if it's associated with an input field
-            associated_input = self.find_associated_input(element)
+            category, priority, description = self.categorize_button(combined_text, type_attr, tag_name)
             
             return {
                 'element': element,
@@ -239,110 +527,53 @@ class SmartButtonAutomation:
                 'priority': priority,
                 'description': description,
                 'combined_text': combined_text,
-                'associated_input': associated_input,
-                'tag_name': element.tag_name.lower(),
+                'associated_input': info['associated_input'],
+                'tag_name': tag_name,
                 'type': type_attr,
                 'clickable': True
             }
             
         except Exception as e:
-            print(f"❌ Error analyzing button: {e}")
+            logger.warning("❌ Error analyzing button: %s", e)
             return None
     
     def categorize_button(self, combined_text: str, type_attr: str, tag_name: str) -> Tuple[str, int, str]:
         """Categorize button based on text content and attributes"""
         
-        # Cookie consent buttons (highest priority for user experience)
-        cookie_patterns = [
-            'accept all', 'accept cookies', 'allow all', 'allow cookies',
-            'agree and continue', 'accept and continue', 'cookie', 'consent',
-            'i accept', 'i agree', 'موافق على الكوكيز', 'قبول الكوكيز', 'موافق'
-        ]
-        
-        # Terms and conditions
-        terms_patterns = [
-            'accept terms', 'agree terms', 'accept conditions', 'agree conditions',
-            'i agree to terms', 'accept privacy', 'موافق على الشروط', 'قبول الشروط',
-            'terms', 'privacy policy', 'موافقة على الشروط'
-        ]
-        
-        # Navigation buttons
-        navigation_patterns = [
-            'next', 'continue', 'proceed', 'forward', 'التالي', 'متابعة', 'المتابعة'
-        ]
-        
-        # Submit/Send buttons
-        submit_patterns = [
-            'submit', 'send', 'post', 'save', 'إرسال', 'حفظ', 'تقديم'
-        ]
-        
-        # Search buttons
-        search_patterns = [
-            'search', 'find', 'بحث', 'البحث'
-        ]
-        
-        # Cancel/Close buttons
-        cancel_patterns = [
-            'cancel', 'close', 'dismiss', 'skip', 'not now', 'later',
-            'إلغاء', 'إغلاق', 'تجاهل', 'لاحقاً', 'ليس الآن'
-        ]
-        
-        # Choice buttons (Yes/No, etc.)
-        choice_patterns = [
-            'yes', 'no', 'ok', 'confirm', 'نعم', 'لا', 'موافق', 'تأكيد'
-        ]
-        
-        # Check patterns in order of priority
-        for pattern in cookie_patterns:
-            if pattern in combined_text:
-                return "cookie_consent", 10, f"Cookie Consent Button: {pattern}"
-        
-        for pattern in terms_patterns:
-            if pattern in combined_text:
-                return "terms_agreement", 9, f"Terms Agreement Button: {pattern}"
+        # One scan over the text; keep the highest-priority category that matched
+        best = None
+        best_priority = 0
+        for match in BUTTON_PATTERN_RE.finditer(combined_text):
+            category = match.lastgroup
+            priority = BUTTON_CATEGORIES[category][0]
+            if priority > best_priority:
+                best, best_priority = category, priority
+                if priority == 10:
+                    break  # Nothing outranks cookie consent
+        
+        if best_priority > 8:
+            return best, best_priority, self.describe_category(best, combined_text)
         
         # Check if it's a submit button with form type
         if type_attr == 'submit' or tag_name == 'button' and 'submit' in combined_text:
             return "submit", 8, "Form Submit Button"
         
-        for pattern in navigation_patterns:
-            if pattern in combined_text:
-                return "navigation", 7, f"Navigation Button: {pattern}"
-        
-        for pattern in search_patterns:
-            if pattern in combined_text:
-                return "search", 6, f"Search Button: {pattern}"
-        
-        for pattern in choice_patterns:
-            if pattern in combined_text:
-                return "choice", 5, f"Choice Button: {pattern}"
-        
-        for pattern in cancel_patterns:
-            if pattern in combined_text:
-                return "cancel", 2, f"Cancel/Close Button: {pattern}"
+        if best:
+            return best, best_priority, self.describe_category(best, combined_text)
         
         # Default category
         return "general", 3, f"General Button: {combined_text[:50]}"
     
+    def describe_category(self, category: str, combined_text: str) -> str:
+        """Description naming the category's first pattern (in table order) found in the text"""
+        pattern = next(p for p in BUTTON_CATEGORY_PATTERNS[category] if p in combined_text)
+        return f"{BUTTON_CATEGORIES[category][1]}: {pattern}"
+    
     def find_associated_input(self, button_element):
         """Find input field associated with this button"""
         try:
-            # Look for nearby input fields
-            parent = button_element.query_selector('xpath=..')
-            if parent:
-                # Look for input fields in the same container
-                inputs = parent.query_selector_all('input, textarea')
-                for inp in inputs:
-                    if inp.is_visible() and inp.is_enabled():
-                        inp_type = inp.get_attribute('type') or 'text'
-                        if inp_type in ['text', 'search', 'email', 'url']:
-                            return {
-                                'element': inp,
-                                'type': inp_type,
-                                'placeholder': inp.get_attribute('placeholder') or '',
-                                'value': inp.input_value()
-                            }
-            return None
+            handle = button_element.evaluate_handle(ASSOCIATED_INPUT_JS)
+            return handle.as_element()
         except Exception:
             return None
     
@@ -353,170 +584,200 @@ class SmartButtonAutomation:
     
     def wait_for_typing_completion(self, input_element, max_wait: int = 30) -> bool:
         """Wait for typing to complete in an input field"""
-        print("⌛ Waiting for typing completion...")
-        
-        initial_value = ""
-        stable_count = 0
-        wait_cycles = 0
+        logger.debug("⌛ Waiting for typing completion...")
         
         try:
-            initial_value = input_element.input_value()
-        except:
-            pass
-        
-        # If field is empty, wait 5 seconds for typing to start
-        if not initial_value.strip():
-            print("📝 Field is empty, waiting for typing to start...")
-            time.sleep(5)
-            try:
-                current_value = input_element.input_value()
-                if not current_value.strip():
-                    print("⏭️ No typing detected, proceeding...")
+            # If field is empty, give typing a moment to start
+            if not input_element.input_value().strip():
+                logger.debug("📝 Field is empty, waiting for typing to start...")
+                try:
+                    self.page.wait_for_function("el => el.value.trim() !== ''", arg=input_element,
+                                                polling=250, timeout=2000)
+                except PlaywrightTimeoutError:
+                    logger.debug("⏭️ No typing detected, proceeding...")
                     return True
-            except:
-                return True
-        
-        # Monitor typing progress
-        last_value = initial_value
-        
-        while wait_cycles < max_wait:
-            time.sleep(1)
-            wait_cycles += 1
             
-            try:
-                current_value = input_element.input_value()
-                
-                if current_value == last_value:
-                    stable_count += 1
-                    # If value has been stable for 3 seconds, typing is likely done
-                    if stable_count >= 3:
-                        print("✅ Typing appears to be complete!")
-                        return True
-                else:
-                    stable_count = 0  # Reset counter if value changed
-                    print(f"📝 Typing in progress... Current length: {len(current_value)}")
-                
-                last_value = current_value
-                
-            except Exception as e:
-                print(f"⚠️ Error monitoring typing: {e}")
-                break
+            # Polling happens inside the browser; we only hear back once the value settles
+            self.page.wait_for_function(TYPING_SETTLED_JS, arg=[input_element, time.monotonic()],
+                                        polling=250, timeout=max_wait * 1000)
+            logger.debug("✅ Typing appears to be complete!")
+        except PlaywrightTimeoutError:
+            logger.debug("⏰ Maximum wait time reached, proceeding...")
+        except Exception as e:
+            logger.warning("⚠️ Error monitoring typing: %s", e)
         
-        print("⏰ Maximum wait time reached, proceeding...")
         return True
     
-    def smart_button_click(self, button_info: Dict) -> Dict:
+    def smart_button_click(self, button_info: Dict) -> ClickResult:
         """Intelligently click buttons based on context and timing"""
         try:
             button = button_info['element']
             category = button_info['category']
             associated_input = button_info.get('associated_input')
             
-            print(f"🎯 Processing {category} button: {button_info['description']}")
+            logger.debug("🎯 Processing %s button: %s", category, button_info['description'])
             
             # Special handling for submit/search buttons with associated inputs
             if category in ['submit', 'search', 'navigation'] and associated_input:
-                input_element = associated_input['element']
                 current_value = associated_input['value']
                 
-                print(f"🔍 Found associated input field with value: '{current_value}'")
+                logger.debug("🔍 Found associated input field with value: '%s'", current_value)
                 
                 # If field is empty or typing might be in progress
                 if not current_value.strip() or self.is_typing_in_progress():
-                    success = self.wait_for_typing_completion(input_element)
-                    if not success:
-                        return {
-                            "success": False,
-                            "message": "Timeout waiting for typing completion",
-                            "category": category
-                        }
+                    # Only look the field up when we are actually going to watch it
+                    input_element = self.find_associated_input(button)
+                    if input_element:
+                        success = self.wait_for_typing_completion(input_element)
+                        if not success:
+                            return ClickResult(False, "Timeout waiting for typing completion", category)
             
             # Click the button
-            print(f"🖱️ Clicking {category} button...")
-            button.click()
+            logger.debug("🖱️ Clicking %s button...", category)
+            if category in ['submit', 'navigation']:
+                # These usually load a new page; wait for its DOM, not for network idle
+                clicked = False
+                try:
+                    with self.page.expect_navigation(wait_until='domcontentloaded', timeout=5000):
+                        button.click()
+                        clicked = True
+                except PlaywrightTimeoutError:
+                    if not clicked:
+                        raise  # The click itself timed out
+                    # Otherwise it was handled in-page without a navigation
+            else:
+                button.click()
+                
+                # Observe the page instead of sleeping: usually settled within a few polls
+                try:
+                    self.page.wait_for_function("() => document.readyState !== 'loading'",
+                                                polling=50, timeout=500)
+                except PlaywrightTimeoutError:
+                    pass
             
-            # Wait for page response
-            time.sleep(2)
+            logger.debug("✅ Successfully clicked %s button!", category)
             
-            # Check if page changed or new content loaded
-            try:
-                self.page.wait_for_load_state('networkidle', timeout=5000)
-            except:
-                pass  # Continue even if network idle timeout occurs
+            return ClickResult(True, f"Successfully clicked {category} button", category, button_info['text'])
             
-            print(f"✅ Successfully clicked {category} button!")
+        except Exception as e:
+            logger.error("❌ Error clicking button: %s", e)
+            return ClickResult(False, f"Error clicking button: {str(e)}", button_info.get('category', 'unknown'))
+    
+    def click_buttons_batch(self, buttons: List[Dict]) -> List[ClickResult]:
+        """Click several low-risk buttons with a single in-page call"""
+        elements = [button['element'] for button in buttons]
+        try:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("🖱️ Clicking %d button(s): %s", len(buttons), ', '.join(button['category'] for button in buttons))
+            clicked = self.page.evaluate(BATCH_CLICK_JS, elements)
             
-            return {
-                "success": True,
-                "message": f"Successfully clicked {category} button",
-                "category": category,
-                "button_text": button_info['text']
-            }
+            # One wait for the clicked buttons (e.g. a cookie banner) to go away
+            clicked_elements = [element for element, was_clicked in zip(elements, clicked) if was_clicked]
+            if clicked_elements:
+                try:
+                    self.page.wait_for_function("elements => elements.every(el => !el.isConnected || el.offsetParent === null)",
+                                                arg=clicked_elements, timeout=2000)
+                except PlaywrightTimeoutError:
+                    pass
+            
+            return [ClickResult(True, f"Successfully clicked {button['category']} button", button['category'], button['text'])
+                    if was_clicked else
+                    ClickResult(False, "Button was detached or hidden before it could be clicked", button['category'])
+                    for button, was_clicked in zip(buttons, clicked)]
             
         except Exception as e:
-            print(f"❌ Error clicking button: {e}")
-            return {
-                "success": False,
-                "message": f"Error clicking button: {str(e)}",
-                "category": button_info.get('category', 'unknown')
-            }
+            logger.error("❌ Error clicking buttons: %s", e)
+            message = f"Error clicking button: {str(e)}"
+            return [ClickResult(False, message, button['category']) for button in buttons]
     
-    def process_all_buttons(self, url: str, categories_filter: List[str] = None) -> Dict:
-        """Process all buttons on a page with smart prioritization"""
-        try:
-            print(f"🌐 Loading page: {url}")
+    def click_in_priority_order(self, buttons: List[Dict], results: List[ClickResult]) -> Tuple[int, bool]:
+        """Click sorted buttons, appending to results; returns (clicked, page_changed)"""
+        processed_count = 0
+        
+        i = 0
+        while i < len(buttons):
+            button_info = buttons[i]
+            i += 1
             
-            if not self.navigate_to_url(url):
-                return {"success": False, "message": "Failed to load page"}
+            if button_info['category'] in BATCH_CLICK_CATEGORIES:
+                # Low-risk buttons next to each other in priority order are clicked together
+                batch = [button_info]
+                while i < len(buttons) and buttons[i]['category'] in BATCH_CLICK_CATEGORIES:
+                    batch.append(buttons[i])
+                    i += 1
+                
+                logger.debug("📊 Processing buttons %d-%d/%d in one batch", i - len(batch) + 1, i, len(buttons))
+                batch_results = self.click_buttons_batch(batch)
+                results.extend(batch_results)
+                processed_count += sum(result.success for result in batch_results)
+                continue
             
-            print("🔍 Scanning for buttons...")
-            buttons = self.find_all_buttons()
+            logger.debug("📊 Processing button %d/%d - 🏷️ Category: %s (Priority: %s) - 📝 Description: %s",
+                         i, len(buttons), button_info['category'], button_info['priority'], button_info['description'])
             
-            if not buttons:
-                return {"success": False, "message": "No buttons found on this page"}
+            result = self.smart_button_click(button_info)
+            results.append(result)
             
-            print(f"✅ Found {len(buttons)} button(s)")
+            if result.success:
+                processed_count += 1
             
-            # Filter by categories if specified
-            if categories_filter:
-                buttons = [b for b in buttons if b['category'] in categories_filter]
-                print(f"🎯 Filtered to {len(buttons)} button(s) matching categories: {categories_filter}")
+            # Check if page has changed significantly (like navigation)
+            if button_info['category'] in ['navigation', 'submit']:
+                logger.debug("🔄 Page may have changed, rescanning...")
+                return processed_count, True  # Re-scan after navigation
+        
+        return processed_count, False
+    
+    def process_all_buttons(self, url: str, categories_filter: List[str] = None) -> Dict:
+        """Process all buttons on a page with smart prioritization"""
+        try:
+            logger.debug("🌐 Loading page: %s", url)
             
-            # Sort by priority (higher priority first)
-            buttons.sort(key=lambda x: x['priority'], reverse=True)
+            if not self.navigate_to_url(url):
+                return {"success": False, "message": "Failed to load page"}
             
+            logger.debug("🔍 Scanning for buttons...")
             results = []
             processed_count = 0
+            total_buttons = 0
+            found_any = False
             
-            for i, button_info in enumerate(buttons, 1):
-                print(f"\n📊 Processing button {i}/{len(buttons)}")
-                print(f"🏷️ Category: {button_info['category']} (Priority: {button_info['priority']})")
-                print(f"📝 Description: {button_info['description']}")
+            for buttons in self.iter_buttons():
+                found_any = found_any or bool(buttons)
+                
+                # Filter by categories if specified
+                if categories_filter:
+                    buttons = [b for b in buttons if b['category'] in categories_filter]
                 
-                result = self.smart_button_click(button_info)
-                results.append(result)
+                if not buttons:
+                    continue
+                
+                logger.debug("✅ Found %d button(s)", len(buttons))
+                total_buttons += len(buttons)
+                
+                # Sort by priority (higher priority first)
+                buttons.sort(key=lambda x: x['priority'], reverse=True)
                 
-                if result['success']:
-                    processed_count += 1
-                    # Small delay between button clicks
-                    time.sleep(1)
+                clicked, page_changed = self.click_in_priority_order(buttons, results)
+                processed_count += clicked
                 
-                # Check if page has changed significantly (like navigation)
-                if button_info['category'] in ['navigation', 'submit']:
-                    print("🔄 Page may have changed, rescanning...")
-                    time.sleep(2)
-                    break  # Re-scan after navigation
+                # Stop scanning once the page moved on or the consent tier already had what we want
+                if page_changed or buttons[0]['priority'] == 10:
+                    break
+            
+            if not found_any:
+                return {"success": False, "message": "No buttons found on this page"}
             
             return {
                 "success": True,
                 "message": f"Processed {processed_count} buttons successfully",
-                "total_buttons": len(buttons),
+                "total_buttons": total_buttons,
                 "processed_buttons": processed_count,
-                "results": results
+                "results": [result.to_dict() for result in results]
             }
             
         except Exception as e:
-            print(f"❌ Error processing buttons: {e}")
+            logger.error("❌ Error processing buttons: %s", e)
             return {"success": False, "message": f"Error: {str(e)}"}
     
     # Keep the original form filling functionality
@@ -524,36 +785,30 @@ class SmartButtonAutomation:
         """Find all input fields on the page"""
         input_fields = []
         
-        selectors = [
-            'input[type="text"]', 'input[type="email"]', 'input[type="password"]',
-            'input[type="search"]', 'input[type="url"]', 'input[type="tel"]',
-            'input[type="number"]', 'input:not([type])', 'textarea',
-            'input[type="date"]', 'input[type="time"]'
-        ]
+        try:
+            elements = self.page.query_selector_all(INPUT_SELECTOR)
+            elements_info = self.page.evaluate(INPUT_INFO_JS, elements)
+        except Exception as e:
+            logger.error("❌ Error searching for input fields: %s", e)
+            return input_fields
         
-        for selector in selectors:
-            try:
-                elements = self.page.query_selector_all(selector)
-                for element in elements:
-                    if element.is_visible() and element.is_enabled():
-                        field_info = self.get_field_info(element, selector)
-                        if field_info:
-                            input_fields.append(field_info)
-            except Exception as e:
-                print(f"❌ Error searching for elements {selector}: {e}")
+        for info in elements_info:
+            field_info = self.get_field_info(elements[info['index']], info)
+            if field_info:
+                input_fields.append(field_info)
         
         return input_fields
     
-    def get_field_info(self, element, selector):
+    def get_field_info(self, element, info: Dict):
         """Get field information"""
         try:
             field_type = "text"
             field_display_name = "Text Input"
-            placeholder = element.get_attribute('placeholder') or ""
-            name = element.get_attribute('name') or ""
-            field_id = element.get_attribute('id') or ""
-            field_class = element.get_attribute('class') or ""
-            input_type = element.get_attribute('type') or "text"
+            placeholder = info['placeholder']
+            name = info['name']
+            field_id = info['id']
+            field_class = info['class']
+            input_type = info['type'] or "text"
             
             # Field type detection logic (same as original)
             if 'search' in input_type.lower() or 'search' in placeholder.lower():
@@ -575,26 +830,76 @@ class SmartButtonAutomation:
                 'input_type': input_type
             }
         except Exception as e:
-            print(f"❌ Error getting field information: {e}")
+            logger.warning("❌ Error getting field information: %s", e)
             return None
 
-# Create single instance
-smart_automation = SmartButtonAutomation()
+# Independent automation slots. Each one has its own Playwright thread and its
+# own tab, so up to AUTOMATION_SLOTS requests can drive the browser at once.
+# The sync Playwright API is bound to the thread that started it, so slots
+# cannot share one driver; the extra slots only start theirs when requests
+# overlap, and stop it again when the session is restarted or closed.
+AUTOMATION_SLOTS = 4
+
+# Most pages one /scan_buttons request may list (each is loaded in a slot's tab)
+MAX_SCAN_URLS = 20
+
+# The first slot works in the user's current tab, like a single instance did
+automation_slots = [SmartButtonAutomation(use_existing_page=(i == 0)) for i in range(AUTOMATION_SLOTS)]
+
+# LIFO so sequential requests keep reusing the first slot; the other slots
+# only connect (and open their tab) when requests actually overlap
+available_slots = queue.LifoQueue()
+for automation in reversed(automation_slots):
+    available_slots.put(automation)
+
+session_started = threading.Event()
+
+@contextmanager
+def acquire_automation():
+    """Borrow a free automation slot for the duration of a request"""
+    automation = available_slots.get()
+    try:
+        if session_started.is_set() and not automation.browser:
+            automation.run(automation.connect_to_existing_browser)
+        yield automation
+    finally:
+        available_slots.put(automation)
+
+def json_response(payload, status: int = 200) -> Response:
+    """Serialize payload with orjson, which is several times faster than jsonify"""
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+
+# Frequent error bodies, serialized once
+NO_URL_ERROR = orjson.dumps({"success": False, "message": "Please provide page URL"})
+NO_SESSION_ERROR = orjson.dumps({"success": False, "message": "Please start session first"})
+
+def error_response(body: bytes) -> Response:
+    """Wrap a pre-serialized error body in a fresh response"""
+    return Response(body, mimetype='application/json')
 
 @app.route('/start_session', methods=['POST'])
 def start_session():
     """Start new session"""
     try:
-        if smart_automation.browser:
-            smart_automation.close_browser_connection()
+        def connect(automation):
+            if automation.browser:
+                automation.close_browser_connection()
+            return automation.start_browser_connection()
+        
+        # Drop every slot's old connection and the extra slots' drivers; they
+        # start again (and reconnect) only when requests overlap
+        for automation in automation_slots[1:]:
+            automation.run(automation.stop_playwright)
         
-        success = smart_automation.start_browser_connection()
+        session_started.clear()
+        success = automation_slots[0].run(connect, automation_slots[0])
         if success:
-            return jsonify({"success": True, "message": "Session started successfully"})
+            session_started.set()
+            return json_response({"success": True, "message": "Session started successfully"})
         else:
-            return jsonify({"success": False, "message": "Failed to connect to browser. Please start a browser with debug mode first."})
+            return json_response({"success": False, "message": "Failed to connect to browser. Please start a browser with debug mode first."})
     except Exception as e:
-        return jsonify({"success": False, "message": f"Error: {str(e)}"})
+        return json_response({"success": False, "message": f"Error: {str(e)}"})
 
 @app.route('/process_buttons', methods=['POST'])
 def process_buttons():
@@ -605,57 +910,84 @@ def process_buttons():
         categories = data.get('categories')  # Optional filter
         
         if not url:
-            return jsonify({"success": False, "message": "Please provide page URL"})
-        
-        if not smart_automation.browser:
-            return jsonify({"success": False, "message": "Please start session first"})
+            return error_response(NO_URL_ERROR)
         
-        result = smart_automation.process_all_buttons(url, categories)
-        return jsonify(result)
+        with acquire_automation() as automation:
+            if not automation.browser:
+                return error_response(NO_SESSION_ERROR)
+            
+            result = automation.run(automation.process_all_buttons, url, categories)
+        return json_response(result)
         
     except Exception as e:
-        return jsonify({"success": False, "message": f"Error: {str(e)}"})
+        return json_response({"success": False, "message": f"Error: {str(e)}"})
+
+def scan_url(url: str) -> Dict:
+    """Scan one URL on a free slot and describe its buttons"""
+    with acquire_automation() as automation:
+        if not automation.browser:
+            return {"success": False, "message": "Please start session first"}
+        
+        def scan():
+            if not automation.navigate_to_url(url):
+                return None
+            return automation.find_all_buttons()
+        
+        buttons = automation.run(scan)
+    
+    if buttons is None:
+        return {"success": False, "message": "Failed to load page"}
+    
+    buttons_info = []
+    for button in buttons:
+        buttons_info.append({
+            'category': button['category'],
+            'priority': button['priority'],
+            'description': button['description'],
+            'text': button['text'],
+            'tag_name': button['tag_name'],
+            'has_associated_input': button['associated_input'] is not None
+        })
+    
+    # Sort by priority
+    buttons_info.sort(key=lambda x: x['priority'], reverse=True)
+    
+    return {
+        "success": True,
+        "buttons_count": len(buttons_info),
+        "buttons": buttons_info
+    }
 
 @app.route('/scan_buttons', methods=['POST'])
 def scan_buttons():
-    """Scan and list all buttons without clicking them"""
+    """Scan and list all buttons without clicking them (url, or a list of urls)"""
     try:
         data = request.json
         url = data.get('url')
+        urls = data.get('urls')
         
-        if not url:
-            return jsonify({"success": False, "message": "Please provide page URL"})
-        
-        if not smart_automation.browser:
-            return jsonify({"success": False, "message": "Please start session first"})
+        if not url and urls is None:
+            return error_response(NO_URL_ERROR)
         
-        if not smart_automation.navigate_to_url(url):
-            return jsonify({"success": False, "message": "Failed to load page"})
+        if url:
+            return json_response(scan_url(url))
         
-        buttons = smart_automation.find_all_buttons()
+        if not isinstance(urls, list) or not urls or not all(isinstance(page_url, str) and page_url.strip() for page_url in urls):
+            return json_response({"success": False, "message": "urls must be a non-empty list of page URLs"}, 400)
+        if len(urls) > MAX_SCAN_URLS:
+            return json_response({"success": False, "message": f"At most {MAX_SCAN_URLS} URLs per request"}, 400)
         
-        buttons_info = []
-        for button in buttons:
-            buttons_info.append({
-                'category': button['category'],
-                'priority': button['priority'],
-                'description': button['description'],
-                'text': button['text'],
-                'tag_name': button['tag_name'],
-                'has_associated_input': button['associated_input'] is not None
-            })
+        # Scan the pages in parallel, one slot per page
+        with ThreadPoolExecutor(max_workers=AUTOMATION_SLOTS) as executor:
+            results = list(executor.map(scan_url, urls))
         
-        # Sort by priority
-        buttons_info.sort(key=lambda x: x['priority'], reverse=True)
-        
-        return jsonify({
+        return json_response({
             "success": True,
-            "buttons_count": len(buttons_info),
-            "buttons": buttons_info
+            "results": [dict(result, url=page_url) for page_url, result in zip(urls, results)]
         })
         
     except Exception as e:
-        return jsonify({"success": False, "message": f"Error: {str(e)}"})
+        return json_response({"success": False, "message": f"Error: {str(e)}"})
 
 @app.route('/click_specific_button', methods=['POST'])
 def click_specific_button():
@@ -667,45 +999,52 @@ def click_specific_button():
         button_text = data.get('text')
         
         if not url:
-            return jsonify({"success": False, "message": "Please provide page URL"})
+            return error_response(NO_URL_ERROR)
         
         if not button_category and not button_text:
-            return jsonify({"success": False, "message": "Please provide either button category or text"})
-        
-        if not smart_automation.browser:
-            return jsonify({"success": False, "message": "Please start session first"})
-        
-        if not smart_automation.navigate_to_url(url):
-            return jsonify({"success": False, "message": "Failed to load page"})
-        
-        buttons = smart_automation.find_all_buttons()
+            return json_response({"success": False, "message": "Please provide either button category or text"})
         
-        target_button = None
-        for button in buttons:
-            if button_category and button['category'] == button_category:
-                target_button = button
-                break
-            elif button_text and button_text.lower() in button['text'].lower():
-                target_button = button
-                break
-        
-        if not target_button:
-            return jsonify({"success": False, "message": "Button not found"})
-        
-        result = smart_automation.smart_button_click(target_button)
-        return jsonify(result)
+        with acquire_automation() as automation:
+            if not automation.browser:
+                return error_response(NO_SESSION_ERROR)
+            
+            def click():
+                if not automation.navigate_to_url(url):
+                    return {"success": False, "message": "Failed to load page"}
+                
+                buttons = automation.find_all_buttons()
+                
+                target_button = None
+                for button in buttons:
+                    if button_category and button['category'] == button_category:
+                        target_button = button
+                        break
+                    elif button_text and button_text.lower() in button['text'].lower():
+                        target_button = button
+                        break
+                
+                if not target_button:
+                    return {"success": False, "message": "Button not found"}
+                
+                return automation.smart_button_click(target_button).to_dict()
+            
+            result = automation.run(click)
+        return json_response(result)
         
     except Exception as e:
-        return jsonify({"success": False, "message": f"Error: {str(e)}"})
+        return json_response({"success": False, "message": f"Error: {str(e)}"})
 
 @app.route('/close_session', methods=['POST'])
 def close_session():
     """End session and close browser connection"""
     try:
-        smart_automation.close_browser_connection()
-        return jsonify({"success": True, "message": "Session closed successfully"})
+        session_started.clear()
+        automation_slots[0].run(automation_slots[0].close_browser_connection)
+        for automation in automation_slots[1:]:
+            automation.run(automation.stop_playwright)
+        return json_response({"success": True, "message": "Session closed successfully"})
     except Exception as e:
-        return jsonify({"success": False, "message": f"Error: {str(e)}"})
+        return json_response({"success": False, "message": f"Error: {str(e)}"})
 
 # Keep original form filling endpoints for compatibility
 @app.route('/fill_form', methods=['POST'])
@@ -716,18 +1055,18 @@ def fill_form():
         url = data.get('url')
         
         if not url:
-            return jsonify({"success": False, "message": "Please provide page URL"})
+            return error_response(NO_URL_ERROR)
         
-        if not smart_automation.browser:
-            return jsonify({"success": False, "message": "Please start session first"})
+        if not session_started.is_set():
+            return error_response(NO_SESSION_ERROR)
         
         # Use original form filling logic here
         # This would need to be adapted from the original interactive_fill_form method
         
-        return jsonify({"success": True, "message": "Form filling functionality available"})
+        return json_response({"success": True, "message": "Form filling functionality available"})
         
     except Exception as e:
-        return jsonify({"success": False, "message": f"Error: {str(e)}"})
+        return json_response({"success": False, "message": f"Error: {str(e)}"})
 
 if __name__ == '__main__':
     print("🚀 Starting Smart Button Automation API")
@@ -749,7 +1088,12 @@ if __name__ == '__main__':
     print("   • cancel (Priority 2) - Cancel/Close buttons")
     print("-" * 60)
     
+    # Progress is logged to stderr; at INFO the per-button debug messages are
+    # dropped before any formatting. Use DEBUG to trace every button
+    logging.basicConfig(stream=sys.stderr, level=logging.INFO, format='%(message)s')
+    
     try:
         app.run(debug=True, host='0.0.0.0', port=5000)
     finally:
-        smart_automation.close_browser_connection()
+        for automation in automation_slots:
+            automation.shutdown()
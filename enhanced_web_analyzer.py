@@ -1,22 +1,99 @@
 # -*- coding: utf-8 -*-
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, send_file
 from flask_cors import CORS
-import pandas as pd
-from playwright.sync_api import sync_playwright, Error as PlaywrightError
-from bs4 import BeautifulSoup, element as bs4_element
-import json
+from playwright.sync_api import sync_playwright, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+import lxml.html
+from lxml import etree
+import csv
+import gzip
+import orjson
 import time
 import re
+import sys
 import os
+import queue
+import threading
+import urllib.request
 import uuid
 from urllib.parse import urljoin, urlparse
-from collections import defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
 from datetime import datetime
 
 app = Flask(__name__)
 CORS(app)  # لتمكين CORS للواجهات الأمامية
 
+# أنماط تصنيف النص في نمط واحد بمجموعات مسماة، مرتبة حسب الأولوية
+# (يُطبق على النص بأحرف صغيرة، فيُمسح النص مرة واحدة بدلاً من أربع)
+TEXT_TYPE_RE = re.compile(
+    r'\b(?:(?P<login>تسجيل دخول|login|sign in)|(?P<search>بحث|search)'
+    r'|(?P<submit>إرسال|submit|send)|(?P<cancel>إلغاء|cancel|close))\b'
+)
+TEXT_TYPE_RANK = {'login': 0, 'search': 1, 'submit': 2, 'cancel': 3}
+NUMERIC_RE = re.compile(r'^\d+$')
+EMAIL_RE = re.compile(r'@.*\.(com|org|net)')
+
+# اسم جذر المستند كما كان يظهر في المسارات الهرمية مع BeautifulSoup
+DOCUMENT_NAME = '[document]'
+
+# الخصائص متعددة القيم (تُقسم إلى قوائم كما في BeautifulSoup)
+MULTI_VALUED_ATTRIBUTES = {
+    '*': {'class', 'accesskey', 'dropzone'},
+    'a': {'rel', 'rev'},
+    'link': {'rel', 'rev'},
+    'td': {'headers'},
+    'th': {'headers'},
+    'form': {'accept-charset'},
+    'object': {'archive'},
+    'area': {'rel'},
+    'icon': {'sizes'},
+    'iframe': {'sandbox'},
+    'output': {'for'},
+}
+
+# أعمدة ملف CSV بالترتيب
+CSV_COLUMNS = (
+    'element_id', 'tag_name', 'primary_selector', 'all_selectors', 'category', 'subcategory',
+    'text_content', 'semantic_type', 'importance', 'page_region', 'is_interactive', 'has_text',
+    'element_attributes',
+)
+
+# المناطق الرئيسية في الصفحة
+REGION_TAGS = {'header', 'main', 'footer', 'nav', 'aside', 'section', 'article'}
+
+# نصوص هذه العناصر لا تُحسب ضمن نص العناصر الأخرى (سكربتات، أنماط، قوالب...)
+STRING_CONTAINER_TAGS = {'script', 'style', 'template', 'rt', 'rp'}
+
+# عدد خيوط Playwright، لكل منها اتصاله الخاص بـ Chrome، فتُحمّل عدة صفحات في آن واحد
+PLAYWRIGHT_WORKERS = 4
+
+class PlaywrightState(threading.local):
+    """اتصال Playwright الخاص بكل خيط (الواجهة المتزامنة مرتبطة بالخيط الذي أنشأها)"""
+    playwright = None
+    browser = None
+
+@dataclass(slots=True)
+class AnalysisCaches:
+    """ذاكرة مؤقتة لتحليل صفحة واحدة: العناصر المتشابهة تُعالج مرة واحدة.
+    تُنشأ لكل استدعاء تحليل، فلا تتشاركها الطلبات المتزامنة"""
+    selectors: dict = field(default_factory=dict)
+    categories: dict = field(default_factory=dict)
+    paths: dict = field(default_factory=dict)
+    regions: dict = field(default_factory=dict)
+
+@dataclass(slots=True)
+class DetailedElement:
+    """بيانات عنصر مهم في نتيجة التحليل (كائن واحد بدلاً من قاموس لكل عنصر)"""
+    element_id: int
+    selectors: dict
+    category: dict
+    semantic_info: dict
+    element_context: dict
+    raw_attributes: dict
+
 class WebPageAnalyzer:
     def __init__(self):
         # تعريف العناصر التفاعلية والوسائط والنصوص
@@ -26,6 +103,13 @@ class WebPageAnalyzer:
         self.NAVIGATION_TAGS = {'nav', 'menu', 'menuitem'}
         self.LIST_TAGS = {'ul', 'ol', 'dl'}
         
+        # النوع الرئيسي لكل وسم في بحث واحد (الوسائط أولاً كما في ترتيب التصنيف)
+        self.TAG_TO_PRIMARY_TYPE = {}
+        for primary_type, tags in (('list', self.LIST_TAGS), ('navigation', self.NAVIGATION_TAGS),
+                                   ('text', self.TEXT_TAGS), ('interactive', self.INTERACTIVE_TAGS),
+                                   ('media', self.MEDIA_TAGS)):
+            self.TAG_TO_PRIMARY_TYPE.update(dict.fromkeys(tags, primary_type))
+        
         # أنواع الحقول التفاعلية
         self.INPUT_TYPES = {
             'text': 'نص',
@@ -44,77 +128,246 @@ class WebPageAnalyzer:
             'reset': 'إعادة تعيين',
             'button': 'زر'
         }
+        
+        # مجموعة صغيرة من خيوط Playwright تبقى طوال عمر العملية. لكل خيط اتصاله
+        # الخاص بـ Chrome، ويأخذ كل طلب أول خيط غير مشغول، فلا تنتظر الطلبات
+        # المتزامنة بعضها إلا إذا انشغلت كل الخيوط
+        self._state = PlaywrightState()
+        # اتصال كل خيط (حسب اسمه)، ليُقرأ من خارج خيوط Playwright دون انتظارها
+        self._browsers = {}
+        self._executors = [
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'playwright-{i}')
+            for i in range(PLAYWRIGHT_WORKERS)
+        ]
+        self._idle_executors = queue.Queue()
+        for executor in self._executors:
+            self._idle_executors.put(executor)
+
+    def run(self, func, *args, **kwargs):
+        """ينفذ func على أول خيط Playwright غير مشغول ويُرجع نتيجتها"""
+        executor = self._idle_executors.get()
+        try:
+            return executor.submit(func, *args, **kwargs).result()
+        finally:
+            self._idle_executors.put(executor)
+
+    def get_browser(self):
+        """يُرجع اتصال الخيط الحالي بـ Chrome، ويُنشئه عند أول استخدام أو بعد انقطاعه"""
+        state = self._state
+        if state.playwright is None:
+            state.playwright = sync_playwright().start()
+        if state.browser is None or not state.browser.is_connected():
+            state.browser = state.playwright.chromium.connect_over_cdp("http://localhost:9222")
+            self._browsers[threading.current_thread().name] = state.browser
+        return state.browser
+
+    def is_connected(self) -> bool:
+        """هل لدى أي خيط اتصال قائم بـ Chrome؟ (قراءة علَم فقط، آمنة من أي خيط)"""
+        return any(browser.is_connected() for browser in list(self._browsers.values()))
+
+    def wait_until_ready(self, page):
+        """بدلاً من انتظار ثابت: يعود فوراً إن كانت الصفحة جاهزة، وينتظر قليلاً
+        فقط للصفحات التي ما زالت تعرض مؤشر تحميل"""
+        try:
+            page.wait_for_function(
+                "() => document.readyState === 'complete' && !document.querySelector('[data-loading]')",
+                timeout=5000
+            )
+        except PlaywrightTimeoutError:
+            pass
+
+    def fetch_page(self, url: str) -> tuple:
+        """يفتح الرابط في تبويب جديد ويُرجع (محتوى الصفحة، العنوان)؛ يُغلق التبويب فقط"""
+        page = self.get_browser().contexts[0].new_page()
+        try:
+            page.goto(url, wait_until='networkidle', timeout=90000)
+            self.wait_until_ready(page)
+            return page.content(), page.title()
+        finally:
+            page.close()
+
+    def fetch_pages(self, urls: list) -> list:
+        """يحمّل عدة روابط بالتوازي في تبويبات من نفس السياق، ويُرجع لكل رابط
+        (محتوى الصفحة، العنوان) أو الاستثناء الذي حدث له"""
+        context = self.get_browser().contexts[0]
+        pages = []
+        try:
+            # بدء كل التنقلات أولاً (تعود goto عند وصول الاستجابة)، فتُحمّل الصفحات معاً
+            started = []
+            for url in urls:
+                page = context.new_page()
+                pages.append(page)
+                try:
+                    page.goto(url, wait_until='commit', timeout=90000)
+                    started.append(None)
+                except Exception as e:
+                    started.append(e)
+            
+            results = []
+            for page, error in zip(pages, started):
+                if error is not None:
+                    results.append(error)
+                    continue
+                try:
+                    page.wait_for_load_state('networkidle', timeout=90000)
+                    self.wait_until_ready(page)
+                    results.append((page.content(), page.title()))
+                except Exception as e:
+                    results.append(e)
+            return results
+        finally:
+            for page in pages:
+                page.close()
+
+    def shutdown(self):
+        """يقطع اتصالات Chrome ويوقف Playwright في كل الخيوط (عند إنهاء العملية)"""
+        def stop():
+            state = self._state
+            if state.browser is not None and state.browser.is_connected():
+                state.browser.close()
+            state.browser = None
+            self._browsers.pop(threading.current_thread().name, None)
+            if state.playwright is not None:
+                state.playwright.stop()
+                state.playwright = None
+        for executor in self._executors:
+            executor.submit(stop).result()
+            executor.shutdown()
+
+    def element_attributes(self, element: lxml.html.HtmlElement) -> dict:
+        """يُرجع خصائص العنصر مع تقسيم الخصائص متعددة القيم (مثل class) إلى قوائم"""
+        multi_valued = MULTI_VALUED_ATTRIBUTES['*'] | MULTI_VALUED_ATTRIBUTES.get(element.tag, set())
+        return {
+            sys.intern(name): value.split() if name in multi_valued else value
+            for name, value in element.attrib.items()
+        }
+
+    def element_text(self, element: lxml.html.HtmlElement) -> str:
+        """نص العنصر مع حذف المسافات من كل جزء، دون نصوص السكربتات والأنماط والقوالب"""
+        wanted = element.tag if element.tag in STRING_CONTAINER_TAGS else None
+        if wanted is None and next(element.iterancestors(*STRING_CONTAINER_TAGS), None) is not None:
+            return ''
+        
+        parts = []
+        
+        def collect(node, container):
+            if node.tag in STRING_CONTAINER_TAGS:
+                container = node.tag
+            if node.text and container == wanted:
+                parts.append(node.text.strip())
+            for child in node:
+                if isinstance(child.tag, str):
+                    collect(child, container)
+                if child.tail and container == wanted:
+                    parts.append(child.tail.strip())
+        
+        collect(element, wanted)
+        return ''.join(parts)
+
+    def sibling_text(self, node) -> str:
+        """نص العقدة الشقيقة المجاورة: النص أو التعليق كما هو، والعنصر لا نص له هنا
+        (كان يُحوّل إلى HTML كاملاً فقط لأخذ أول 100 حرف)"""
+        if node is None:
+            return ''
+        if isinstance(node, str):
+            return node
+        if not isinstance(node.tag, str):  # تعليق
+            return node.text or ''
+        return ''
 
-    def generate_advanced_selector(self, element: bs4_element.Tag) -> dict:
+    def previous_sibling(self, element: lxml.html.HtmlElement):
+        """العقدة السابقة مباشرة للعنصر (نص أو عنصر)"""
+        previous = element.getprevious()
+        if previous is not None:
+            return previous.tail or previous
+        parent = element.getparent()
+        return parent.text if parent is not None else None
+
+    def next_sibling(self, element: lxml.html.HtmlElement):
+        """العقدة التالية مباشرة للعنصر (نص أو عنصر)"""
+        return element.tail or element.getnext()
+
+    def generate_advanced_selector(self, element: lxml.html.HtmlElement, caches: AnalysisCaches) -> dict:
         """ينشئ مُحددات متقدمة للعنصر مع معلومات إضافية للذكاء الاصطناعي"""
-        selectors = {}
-        
-        # المُحدد بالـ ID (الأقوى)
-        if element.has_attr('id'):
-            selectors['id_selector'] = f"#{element['id']}"
-            selectors['priority'] = 'high'
-        
-        # المُحدد بالكلاس
-        if element.has_attr('class'):
-            classes = [c for c in element['class'] if c]
-            if classes:
-                selectors['class_selector'] = f"{element.name}.{'.'.join(classes)}"
-                selectors['classes'] = classes
+        attrib = element.attrib
         
-        # المُحدد بالخصائص
-        if element.has_attr('name'):
-            selectors['name_selector'] = f"{element.name}[name='{element['name']}']"
-        
-        if element.has_attr('type'):
-            selectors['type_selector'] = f"{element.name}[type='{element['type']}']"
+        # العناصر المتشابهة (نفس الوسم والخصائص المميزة) تشترك في نفس المُحددات
+        key = (element.tag, attrib.get('id'), attrib.get('class'), attrib.get('name'), attrib.get('type'))
+        cached = caches.selectors.get(key)
+        if cached is None:
+            cached = {}
+            
+            # المُحدد بالـ ID (الأقوى)
+            if 'id' in attrib:
+                cached['id_selector'] = f"#{attrib['id']}"
+                cached['priority'] = 'high'
+            
+            # المُحدد بالكلاس
+            if 'class' in attrib:
+                classes = attrib['class'].split()
+                if classes:
+                    cached['class_selector'] = f"{element.tag}.{'.'.join(classes)}"
+                    cached['classes'] = classes
+            
+            # المُحدد بالخصائص
+            if 'name' in attrib:
+                cached['name_selector'] = f"{element.tag}[name='{attrib['name']}']"
+            
+            if 'type' in attrib:
+                cached['type_selector'] = f"{element.tag}[type='{attrib['type']}']"
+            
+            # المُحدد النسبي (موقع العنصر)
+            cached['tag_selector'] = sys.intern(element.tag)
+            caches.selectors[key] = cached
         
-        # المُحدد النسبي (موقع العنصر)
-        selectors['tag_selector'] = element.name
+        selectors = dict(cached)
         
         # المسار الهرمي
-        path_parts = []
-        current = element
-        while current and current.name:
-            if current.has_attr('id'):
-                path_parts.append(f"{current.name}#{current['id']}")
-                break
-            elif current.has_attr('class'):
-                classes = [c for c in current['class'] if c]
-                if classes:
-                    path_parts.append(f"{current.name}.{classes[0]}")
-                else:
-                    path_parts.append(current.name)
-            else:
-                path_parts.append(current.name)
-            current = current.parent
-            if len(path_parts) > 5:  # تجنب المسارات الطويلة جداً
-                break
-        
-        selectors['hierarchical_path'] = ' > '.join(reversed(path_parts))
+        selectors['hierarchical_path'] = ' > '.join(reversed(self.path_parts(element, caches)))
         
         return selectors
 
-    def analyze_element_context(self, element: bs4_element.Tag) -> dict:
+    def path_parts(self, element, caches: AnalysisCaches) -> tuple:
+        """أجزاء المسار الهرمي من العنصر صعوداً، محفوظة لكل عنصر ليعيد أبناؤه استخدامها"""
+        parts = caches.paths.get(element)
+        if parts is not None:
+            return parts
+        
+        if element is None:
+            parts = (DOCUMENT_NAME,)
+        else:
+            attrib = element.attrib
+            if 'id' in attrib:
+                parts = (f"{element.tag}#{attrib['id']}",)
+            else:
+                classes = attrib['class'].split() if 'class' in attrib else None
+                fragment = f"{element.tag}.{classes[0]}" if classes else element.tag
+                # تجنب المسارات الطويلة جداً
+                parts = ((fragment,) + self.path_parts(element.getparent(), caches))[:6]
+        
+        caches.paths[element] = parts
+        return parts
+
+    def analyze_element_context(self, element: lxml.html.HtmlElement, caches: AnalysisCaches) -> dict:
         """يحلل السياق المحيط بالعنصر لفهم أفضل"""
         context = {}
         
         # العنصر الأب المباشر
-        if element.parent and element.parent.name:
-            context['parent_tag'] = element.parent.name
-            if element.parent.has_attr('class'):
-                context['parent_classes'] = element.parent['class']
+        parent = element.getparent()
+        if parent is not None:
+            context['parent_tag'] = sys.intern(parent.tag)
+            if 'class' in parent.attrib:
+                context['parent_classes'] = parent.attrib['class'].split()
+        else:
+            context['parent_tag'] = DOCUMENT_NAME
         
         # العناصر الشقيقة
-        siblings = element.find_next_siblings()[:3]  # أول 3 عناصر شقيقة
-        context['next_siblings'] = [sib.name for sib in siblings if sib.name]
+        siblings = islice(element.itersiblings(etree.Element), 3)  # أول 3 عناصر شقيقة
+        context['next_siblings'] = [sys.intern(sib.tag) for sib in siblings]
         
         # النص المحيط
-        prev_text = ""
-        next_text = ""
-        if element.previous_sibling:
-            prev_text = str(element.previous_sibling).strip()[:100]
-        if element.next_sibling:
-            next_text = str(element.next_sibling).strip()[:100]
+        prev_text = self.sibling_text(self.previous_sibling(element)).strip()[:100]
+        next_text = self.sibling_text(self.next_sibling(element)).strip()[:100]
             
         context['surrounding_text'] = {
             'before': prev_text,
@@ -122,83 +375,111 @@ class WebPageAnalyzer:
         }
         
         # تحديد نوع المنطقة (header, main, footer, nav, etc.)
-        region_parent = element.find_parent(['header', 'main', 'footer', 'nav', 'aside', 'section', 'article'])
-        if region_parent:
-            context['page_region'] = region_parent.name
+        page_region = self.page_region(element, caches)
+        if page_region:
+            context['page_region'] = page_region
         
         return context
 
-    def extract_semantic_info(self, element: bs4_element.Tag) -> dict:
+    def page_region(self, element: lxml.html.HtmlElement, caches: AnalysisCaches) -> str:
+        """يُرجع اسم أقرب منطقة رئيسية تحتوي العنصر (header, main, footer...) أو None"""
+        parent = element.getparent()
+        return self.inner_region(parent, caches) if parent is not None else None
+
+    def inner_region(self, element: lxml.html.HtmlElement, caches: AnalysisCaches) -> str:
+        """المنطقة التي يقع فيها أبناء العنصر، محفوظة لكل عنصر فتنتقل من الأب إلى أبنائه
+        دون الصعود في شجرة الأسلاف لكل عنصر"""
+        if element in caches.regions:
+            return caches.regions[element]
+        region = sys.intern(element.tag) if element.tag in REGION_TAGS else self.page_region(element, caches)
+        caches.regions[element] = region
+        return region
+
+    def extract_semantic_info(self, element: lxml.html.HtmlElement) -> dict:
         """يستخرج المعلومات الدلالية من العنصر"""
         semantic = {}
         
         # تحليل النص لاستخراج المعنى
-        text = element.get_text(strip=True)
+        text = self.element_text(element)
         if text:
             semantic['text_content'] = text
             semantic['text_length'] = len(text)
             
             # تصنيف نوع النص
-            if re.search(r'\b(تسجيل دخول|login|sign in)\b', text.lower()):
-                semantic['text_type'] = 'login'
-            elif re.search(r'\b(بحث|search)\b', text.lower()):
-                semantic['text_type'] = 'search'
-            elif re.search(r'\b(إرسال|submit|send)\b', text.lower()):
-                semantic['text_type'] = 'submit'
-            elif re.search(r'\b(إلغاء|cancel|close)\b', text.lower()):
-                semantic['text_type'] = 'cancel'
-            elif re.search(r'^\d+$', text):
+            # الكلمات لا تتداخل، فيكفي مسح واحد مع الاحتفاظ بالنوع الأعلى أولوية
+            text_type = None
+            for match in TEXT_TYPE_RE.finditer(text.lower()):
+                if text_type is None or TEXT_TYPE_RANK[match.lastgroup] < TEXT_TYPE_RANK[text_type]:
+                    text_type = match.lastgroup
+                    if text_type == 'login':
+                        break
+            if text_type:
+                semantic['text_type'] = text_type
+            elif NUMERIC_RE.search(text):
                 semantic['text_type'] = 'numeric'
-            elif re.search(r'@.*\.(com|org|net)', text):
+            elif EMAIL_RE.search(text):
                 semantic['text_type'] = 'email'
             elif text.startswith('http'):
                 semantic['text_type'] = 'url'
         
         # تحليل الخصائص الدلالية
-        if element.has_attr('placeholder'):
-            semantic['placeholder'] = element['placeholder']
+        attrib = element.attrib
+        if 'placeholder' in attrib:
+            semantic['placeholder'] = attrib['placeholder']
         
-        if element.has_attr('title'):
-            semantic['title'] = element['title']
+        if 'title' in attrib:
+            semantic['title'] = attrib['title']
         
-        if element.has_attr('alt'):
-            semantic['alt_text'] = element['alt']
+        if 'alt' in attrib:
+            semantic['alt_text'] = attrib['alt']
             
-        if element.has_attr('aria-label'):
-            semantic['aria_label'] = element['aria-label']
+        if 'aria-label' in attrib:
+            semantic['aria_label'] = attrib['aria-label']
         
-        if element.has_attr('role'):
-            semantic['role'] = element['role']
+        if 'role' in attrib:
+            semantic['role'] = attrib['role']
         
         return semantic
 
-    def categorize_element_advanced(self, element: bs4_element.Tag) -> dict:
+    def categorize_element_advanced(self, element: lxml.html.HtmlElement, caches: AnalysisCaches) -> dict:
         """يصنف العنصر بطريقة متقدمة مع معلومات تفصيلية"""
-        tag_name = element.name.lower()
+        tag_name = sys.intern(element.tag.lower())
+        attrib = element.attrib
+        
+        # التصنيف يعتمد فقط على هذه الخصائص، عدا القوائم التي تُحسب عناصرها
+        key = (tag_name, 'onclick' in attrib, attrib.get('src'), attrib.get('type'), attrib.get('href'))
+        cached = caches.categories.get(key)
+        if cached is not None:
+            return dict(cached)
+        
         category = {}
         
-        # التصنيف الرئيسي
-        if tag_name in self.MEDIA_TAGS:
+        # التصنيف الرئيسي (onclick يجعل أي عنصر غير الوسائط تفاعلياً)
+        primary_type = self.TAG_TO_PRIMARY_TYPE.get(tag_name, 'container')
+        if primary_type != 'media' and 'onclick' in attrib:
+            primary_type = 'interactive'
+        
+        if primary_type == 'media':
             category['primary_type'] = 'media'
             category['media_subtype'] = tag_name
-            if element.has_attr('src'):
-                category['source_url'] = element['src']
+            if 'src' in attrib:
+                category['source_url'] = attrib['src']
         
-        elif tag_name in self.INTERACTIVE_TAGS or element.has_attr('onclick'):
+        elif primary_type == 'interactive':
             category['primary_type'] = 'interactive'
             category['interactive_subtype'] = tag_name
             
             # تفاصيل إضافية للعناصر التفاعلية
             if tag_name == 'input':
-                input_type = element.get('type', 'text')
+                input_type = attrib.get('type', 'text')
                 category['input_type'] = input_type
                 category['input_type_ar'] = self.INPUT_TYPES.get(input_type, input_type)
             
             elif tag_name == 'a':
-                if element.has_attr('href'):
-                    category['link_url'] = element['href']
+                if 'href' in attrib:
+                    category['link_url'] = attrib['href']
                     # تحديد نوع الرابط
-                    href = element['href']
+                    href = attrib['href']
                     if href.startswith('#'):
                         category['link_type'] = 'internal_anchor'
                     elif href.startswith('mailto:'):
@@ -210,7 +491,7 @@ class WebPageAnalyzer:
                     else:
                         category['link_type'] = 'external' if 'http' in href else 'internal'
         
-        elif tag_name in self.TEXT_TAGS:
+        elif primary_type == 'text':
             category['primary_type'] = 'text'
             category['text_subtype'] = tag_name
             
@@ -223,191 +504,225 @@ class WebPageAnalyzer:
             else:
                 category['importance'] = 'low'
         
-        elif tag_name in self.NAVIGATION_TAGS:
+        elif primary_type == 'navigation':
             category['primary_type'] = 'navigation'
             category['nav_subtype'] = tag_name
         
-        elif tag_name in self.LIST_TAGS:
+        elif primary_type == 'list':
             category['primary_type'] = 'list'
             category['list_subtype'] = tag_name
             # حساب عدد عناصر القائمة
-            list_items = element.find_all('li')
-            category['list_items_count'] = len(list_items)
+            category['list_items_count'] = sum(1 for _ in element.iterdescendants('li'))
         
         else:
             category['primary_type'] = 'container'
             category['container_subtype'] = tag_name
         
+        if 'list_items_count' not in category:
+            caches.categories[key] = category
+            return dict(category)
         return category
 
-    def extract_page_structure(self, soup: BeautifulSoup) -> dict:
+    def extract_page_structure(self, root: lxml.html.HtmlElement, all_tags: list) -> dict:
         """يستخرج البنية العامة للصفحة"""
+        # عدّ كل الوسوم في مرور واحد على العناصر المجمعة مسبقاً
+        tag_counts = Counter(element.tag for element in all_tags)
+        title = next(root.iter('title'), None)
         structure = {
-            'page_title': soup.title.string if soup.title else None,
+            'page_title': title.text if title is not None and len(title) == 0 else None,
             'meta_description': None,
             'sections': defaultdict(int),
-            'forms_count': len(soup.find_all('form')),
-            'tables_count': len(soup.find_all('table')),
-            'images_count': len(soup.find_all('img')),
-            'links_count': len(soup.find_all('a')),
+            'forms_count': tag_counts['form'],
+            'tables_count': tag_counts['table'],
+            'images_count': tag_counts['img'],
+            'links_count': tag_counts['a'],
             'headings_hierarchy': defaultdict(int)
         }
         
         # استخراج وصف الصفحة
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        if meta_desc:
+        meta_desc = root.find(".//meta[@name='description']")
+        if meta_desc is not None:
             structure['meta_description'] = meta_desc.get('content')
         
         # تحليل بنية العناوين
         for i in range(1, 7):
-            headings = soup.find_all(f'h{i}')
-            structure['headings_hierarchy'][f'h{i}'] = len(headings)
+            structure['headings_hierarchy'][f'h{i}'] = tag_counts[f'h{i}']
         
         # تحليل الأقسام الرئيسية
         main_sections = ['header', 'nav', 'main', 'aside', 'footer', 'section', 'article']
         for section in main_sections:
-            structure['sections'][section] = len(soup.find_all(section))
+            structure['sections'][section] = tag_counts[section]
         
         return structure
 
-    def analyze_page_content(self, url: str) -> dict:
-        """الدالة الرئيسية لتحليل الصفحة"""
-        
-        with sync_playwright() as p:
-            try:
-                browser = p.chromium.connect_over_cdp("http://localhost:9222")
-                context = browser.contexts[0]
+    def analyze_page_content(self, url: str, csv_path: str = None, fetched: tuple = None) -> dict:
+        """الدالة الرئيسية لتحليل الصفحة (تُكتب صفوف CSV مباشرة إلى csv_path إن وُجد)
+        fetched: (محتوى الصفحة، العنوان) إن كانت الصفحة قد حُمّلت مسبقاً"""
+        caches = AnalysisCaches()
+        csv_file = None
+        
+        try:
+            # استخلاص المحتوى عبر خيط Playwright، والتحليل نفسه يتم هنا
+            page_content, page_title = fetched or self.run(self.fetch_page, url)
+            root = lxml.html.document_fromstring(page_content)
+            all_tags = list(root.iter(etree.Element))
+            
+            # تحليل البنية العامة
+            page_structure = self.extract_page_structure(root, all_tags)
+            
+            # صفوف CSV تُكتب أثناء التحليل بدلاً من تجميعها في الذاكرة
+            csv_writer = None
+            if csv_path:
+                csv_file = open(csv_path, 'w', encoding='utf-8-sig', newline='', buffering=1 << 20)
+                csv_writer = csv.writer(csv_file, lineterminator=os.linesep)
+                csv_writer.writerow(CSV_COLUMNS)
+            
+            # قوائم البيانات المحسنة
+            detailed_elements = []
+            primary_types = []  # عمود الأنواع الرئيسية، تُحسب منه الإحصائيات دفعة واحدة
+            
+            # تحليل كل عنصر
+            for i, element in enumerate(all_tags, 1):
+                # البيانات الأساسية (السياق المفصل يُحسب لاحقاً للعناصر المهمة فقط)
+                category = self.categorize_element_advanced(element, caches)
+                semantic = self.extract_semantic_info(element)
+                selectors = self.generate_advanced_selector(element, caches)
                 
-                page = context.new_page()
-                page.goto(url, wait_until='networkidle', timeout=90000)
+                primary_type = category.get('primary_type', 'unknown')
+                primary_types.append(primary_type)
                 
-                time.sleep(2)
-
-                # استخلاص المحتوى
-                page_content = page.content()
-                soup = BeautifulSoup(page_content, 'lxml')
-                all_tags = soup.find_all(True)
+                # بيانات JSON المفصلة (فقط للعناصر المهمة)
+                is_detailed = (primary_type in ['interactive', 'media'] or 
+                               category.get('importance') == 'high' or
+                               semantic.get('text_content', '') and len(semantic['text_content']) > 10)
+                if not is_detailed and csv_writer is None:
+                    continue
                 
-                # تحليل البنية العامة
-                page_structure = self.extract_page_structure(soup)
+                attributes = self.element_attributes(element)
+                context = self.analyze_element_context(element, caches) if is_detailed else None
                 
-                # قوائم البيانات المحسنة
-                csv_data = []
-                detailed_elements = []
-                summary_stats = {
-                    'total_elements': len(all_tags),
-                    'by_category': defaultdict(int),
-                    'interactive_elements': 0,
-                    'media_elements': 0,
-                    'text_elements': 0,
-                    'high_priority_elements': 0
-                }
+                # بيانات CSV المحسنة (بترتيب CSV_COLUMNS)
+                if csv_writer is not None:
+                    page_region = context.get('page_region', '') if context is not None else self.page_region(element, caches)
+                    csv_writer.writerow((
+                        i,
+                        element.tag,
+                        selectors.get('id_selector') or selectors.get('class_selector') or selectors.get('tag_selector'),
+                        orjson.dumps(selectors).decode(),
+                        primary_type,
+                        category.get(f'{primary_type}_subtype', ''),
+                        semantic.get('text_content', ''),
+                        semantic.get('text_type', ''),
+                        category.get('importance', 'normal'),
+                        page_region or '',
+                        primary_type == 'interactive',
+                        bool(semantic.get('text_content')),
+                        orjson.dumps(attributes).decode()
+                    ))
                 
-                # تحليل كل عنصر
-                for i, element in enumerate(all_tags, 1):
-                    # البيانات الأساسية
-                    selectors = self.generate_advanced_selector(element)
-                    context = self.analyze_element_context(element)
-                    semantic = self.extract_semantic_info(element)
-                    category = self.categorize_element_advanced(element)
-                    
-                    # تحديث الإحصائيات
-                    primary_type = category.get('primary_type', 'unknown')
-                    summary_stats['by_category'][primary_type] += 1
-                    
-                    if primary_type == 'interactive':
-                        summary_stats['interactive_elements'] += 1
-                    elif primary_type == 'media':
-                        summary_stats['media_elements'] += 1
-                    elif primary_type == 'text':
-                        summary_stats['text_elements'] += 1
-                    
-                    if selectors.get('priority') == 'high':
-                        summary_stats['high_priority_elements'] += 1
-                    
-                    # بيانات CSV المحسنة
-                    csv_row = {
-                        'element_id': i,
-                        'tag_name': element.name,
-                        'primary_selector': selectors.get('id_selector') or selectors.get('class_selector') or selectors.get('tag_selector'),
-                        'all_selectors': json.dumps(selectors, ensure_ascii=False),
-                        'category': primary_type,
-                        'subcategory': category.get(f'{primary_type}_subtype', ''),
-                        'text_content': semantic.get('text_content', ''),
-                        'semantic_type': semantic.get('text_type', ''),
-                        'importance': category.get('importance', 'normal'),
-                        'page_region': context.get('page_region', ''),
-                        'is_interactive': primary_type == 'interactive',
-                        'has_text': bool(semantic.get('text_content')),
-                        'element_attributes': json.dumps(element.attrs, ensure_ascii=False)
-                    }
-                    csv_data.append(csv_row)
-                    
-                    # بيانات JSON المفصلة (فقط للعناصر المهمة)
-                    if (primary_type in ['interactive', 'media'] or 
-                        category.get('importance') == 'high' or
-                        semantic.get('text_content', '') and len(semantic['text_content']) > 10):
-                        
-                        detailed_element = {
-                            'element_id': i,
-                            'selectors': selectors,
-                            'category': category,
-                            'semantic_info': semantic,
-                            'element_context': context,
-                            'raw_attributes': element.attrs
-                        }
-                        detailed_elements.append(detailed_element)
-
-                # إنشاء النتيجة النهائية
-                result = {
-                    "analysis_metadata": {
-                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        "analyzer_version": "2.0",
-                        "purpose": "Enhanced data for AI model analysis",
-                        "analyzed_url": url,
-                        "page_title": page.title()
-                    },
-                    "page_structure": dict(page_structure),
-                    "elements_summary": dict(summary_stats),
-                    "detailed_elements": detailed_elements,
-                    "csv_data": csv_data,
-                    "ai_assistant_guide": {
-                        "element_identification": "استخدم 'id_selector' أولاً، ثم 'class_selector' للتحديد الدقيق",
-                        "interaction_priority": "العناصر ذات 'priority': 'high' لها أولوية في التفاعل",
-                        "context_usage": "استخدم 'element_context' و 'semantic_info' لفهم الغرض من العنصر",
-                        "text_content_guidance": "النصوص مع 'importance': 'high' هي العناوين الرئيسية"
-                    }
+                if is_detailed:
+                    detailed_elements.append(DetailedElement(i, selectors, category, semantic, context, attributes))
+
+            # الإحصائيات من الأعمدة المجمعة (العناصر ذات الأولوية العالية هي التي لها id)
+            type_counts = Counter(primary_types)
+            summary_stats = {
+                'total_elements': len(all_tags),
+                'by_category': dict(type_counts),
+                'interactive_elements': type_counts['interactive'],
+                'media_elements': type_counts['media'],
+                'text_elements': type_counts['text'],
+                'high_priority_elements': sum(1 for element in all_tags if 'id' in element.attrib)
+            }
+            
+            # إنشاء النتيجة النهائية
+            result = {
+                "analysis_metadata": {
+                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "analyzer_version": "2.0",
+                    "purpose": "Enhanced data for AI model analysis",
+                    "analyzed_url": url,
+                    "page_title": page_title
+                },
+                "page_structure": dict(page_structure),
+                "elements_summary": dict(summary_stats),
+                "detailed_elements": detailed_elements,
+                "ai_assistant_guide": {
+                    "element_identification": "استخدم 'id_selector' أولاً، ثم 'class_selector' للتحديد الدقيق",
+                    "interaction_priority": "العناصر ذات 'priority': 'high' لها أولوية في التفاعل",
+                    "context_usage": "استخدم 'element_context' و 'semantic_info' لفهم الغرض من العنصر",
+                    "text_content_guidance": "النصوص مع 'importance': 'high' هي العناوين الرئيسية"
                 }
-                
-                return {"success": True, "data": result}
+            }
+            
+            return {"success": True, "data": result}
 
-            except PlaywrightError as e:
-                return {"success": False, "error": f"Playwright Error: {str(e)}"}
-            except Exception as e:
-                return {"success": False, "error": f"Unexpected Error: {str(e)}"}
-            finally:
-                if 'browser' in locals() and browser.is_connected():
-                    browser.close()
+        except PlaywrightError as e:
+            return {"success": False, "error": f"Playwright Error: {str(e)}"}
+        except Exception as e:
+            return {"success": False, "error": f"Unexpected Error: {str(e)}"}
+        finally:
+            if csv_file:
+                csv_file.close()
 
 # إنشاء مثيل من المحلل
 analyzer = WebPageAnalyzer()
 
+# الحد الأقصى للروابط في طلب التحليل الجماعي (كل رابط يفتح تبويباً)
+MAX_BULK_URLS = 20
+
+# نتيجة آخر فحص للاتصال بـ Chrome (وقت الفحص، الحالة)، تُعاد لمدة قصيرة
+# حتى لا يصل كل طلب /health إلى المتصفح
+HEALTH_CACHE_TTL = 5.0
+# مهلة سؤال منفذ التصحيح مباشرة عندما لا يوجد اتصال قائم
+HEALTH_PROBE_TIMEOUT = 1.0
+health_cache = (0.0, None)
+
 # مجلد لحفظ الملفات المؤقتة
 UPLOAD_FOLDER = 'temp_files'
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 
+def json_response(payload, status: int = 200) -> Response:
+    """يُسلسل الاستجابة بـ orjson، وهو أسرع بعدة مرات من jsonify"""
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+
+# استجابات JSON الأكبر من هذا الحجم تُضغط بـ gzip إن قبلها العميل
+GZIP_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+
+@app.after_request
+def gzip_response(response):
+    """يضغط استجابات JSON الكبيرة (نتائج التحليل قد تبلغ عدة ميغابايت)"""
+    if (response.mimetype != 'application/json' or response.direct_passthrough or
+            'Content-Encoding' in response.headers):
+        return response
+    
+    data = response.get_data()
+    if len(data) < GZIP_MIN_SIZE:
+        return response
+    
+    # الاستجابة تختلف حسب Accept-Encoding سواء ضُغطت أم لا، فالمخازن الوسيطة تحتاج Vary دائماً
+    response.vary.add('Accept-Encoding')
+    # الجودة 0 (مثل gzip;q=0) تعني أن العميل يرفض gzip صراحة
+    if request.accept_encodings['gzip'] <= 0:
+        return response
+    
+    response.set_data(gzip.compress(data, compresslevel=GZIP_LEVEL))
+    response.headers['Content-Encoding'] = 'gzip'
+    return response
+
 # === API Endpoints ===
 
 @app.route('/', methods=['GET'])
 def home():
     """الصفحة الرئيسية للـ API"""
-    return jsonify({
+    return json_response({
         "message": "🔬 محلل الصفحات المحسن للذكاء الاصطناعي - API",
         "version": "2.0",
         "endpoints": {
             "/": "معلومات عن الـ API",
             "/analyze": "تحليل صفحة ويب (POST)",
+            "/analyze/bulk": "تحليل عدة صفحات معاً (POST)",
             "/health": "فحص حالة الخدمة",
             "/download/<file_type>/<session_id>": "تحميل ملفات التحليل"
         },
@@ -422,16 +737,23 @@ def home():
 @app.route('/health', methods=['GET'])
 def health_check():
     """فحص حالة الخدمة"""
-    try:
-        # اختبار الاتصال بـ Chrome
-        with sync_playwright() as p:
-            browser = p.chromium.connect_over_cdp("http://localhost:9222")
-            browser.close()
+    global health_cache
+    
+    checked_at, chrome_status = health_cache
+    if chrome_status is None or time.monotonic() - checked_at >= HEALTH_CACHE_TTL:
+        # لا يمر الفحص بخيوط Playwright، فلا ينتظر خلف تحليل جارٍ: يكفي اتصال
+        # قائم، وإلا يُسأل منفذ التصحيح في Chrome مباشرة
+        if analyzer.is_connected():
             chrome_status = "متصل"
-    except:
-        chrome_status = "غير متصل"
+        else:
+            try:
+                with urllib.request.urlopen("http://localhost:9222/json/version", timeout=HEALTH_PROBE_TIMEOUT):
+                    chrome_status = "متصل"
+            except Exception:
+                chrome_status = "غير متصل"
+        health_cache = (time.monotonic(), chrome_status)
     
-    return jsonify({
+    return json_response({
         "status": "running",
         "chrome_connection": chrome_status,
         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -443,42 +765,43 @@ def analyze_webpage():
     
     # التحقق من البيانات المرسلة
     if not request.is_json:
-        return jsonify({"success": False, "error": "يجب إرسال البيانات بصيغة JSON"}), 400
+        return json_response({"success": False, "error": "يجب إرسال البيانات بصيغة JSON"}, 400)
     
     data = request.get_json()
     
     if 'url' not in data:
-        return jsonify({"success": False, "error": "يجب تقديم رابط الصفحة (url)"}), 400
+        return json_response({"success": False, "error": "يجب تقديم رابط الصفحة (url)"}, 400)
     
     url = data['url'].strip()
     
     if not (url.startswith("http://") or url.startswith("https://")):
-        return jsonify({"success": False, "error": "رابط غير صحيح. يجب أن يبدأ بـ http:// أو https://"}), 400
+        return json_response({"success": False, "error": "رابط غير صحيح. يجب أن يبدأ بـ http:// أو https://"}, 400)
     
     # خيارات إضافية
     export_files = data.get('export_files', True)  # هل تريد تصدير ملفات CSV و JSON
     
     try:
+        session_id = str(uuid.uuid4())[:8]  # معرف فريد للجلسة
+        
+        # ملف CSV يُكتب أثناء التحليل نفسه
+        csv_filename = os.path.join(UPLOAD_FOLDER, f"analysis_{session_id}.csv") if export_files else None
+        
         # تحليل الصفحة
-        result = analyzer.analyze_page_content(url)
+        result = analyzer.analyze_page_content(url, csv_path=csv_filename)
         
         if not result['success']:
-            return jsonify(result), 500
+            if csv_filename and os.path.exists(csv_filename):
+                os.remove(csv_filename)
+            return json_response(result, 500)
         
         analysis_data = result['data']
-        session_id = str(uuid.uuid4())[:8]  # معرف فريد للجلسة
         
         # حفظ الملفات إذا كان مطلوباً
         if export_files:
-            # حفظ CSV
-            csv_filename = os.path.join(UPLOAD_FOLDER, f"analysis_{session_id}.csv")
-            df = pd.DataFrame(analysis_data['csv_data'])
-            df.to_csv(csv_filename, index=False, encoding='utf-8-sig')
-            
             # حفظ JSON
             json_filename = os.path.join(UPLOAD_FOLDER, f"analysis_{session_id}.json")
-            with open(json_filename, 'w', encoding='utf-8') as f:
-                json.dump(analysis_data, f, ensure_ascii=False, indent=2)
+            with open(json_filename, 'wb') as f:
+                f.write(orjson.dumps(analysis_data, option=orjson.OPT_INDENT_2))
             
             analysis_data['download_links'] = {
                 'csv': f"/download/csv/{session_id}",
@@ -486,11 +809,7 @@ def analyze_webpage():
             }
             analysis_data['session_id'] = session_id
         
-        # إزالة csv_data من النتيجة لتقليل حجم الاستجابة
-        if 'csv_data' in analysis_data:
-            del analysis_data['csv_data']
-        
-        return jsonify({
+        return json_response({
             "success": True,
             "session_id": session_id,
             "message": f"تم تحليل الصفحة بنجاح. تم تحليل {analysis_data['elements_summary']['total_elements']} عنصر",
@@ -498,20 +817,20 @@ def analyze_webpage():
         })
         
     except Exception as e:
-        return jsonify({"success": False, "error": f"خطأ في التحليل: {str(e)}"}), 500
+        return json_response({"success": False, "error": f"خطأ في التحليل: {str(e)}"}, 500)
 
 @app.route('/download/<file_type>/<session_id>', methods=['GET'])
 def download_file(file_type, session_id):
     """تحميل ملفات التحليل"""
     
     if file_type not in ['csv', 'json']:
-        return jsonify({"error": "نوع ملف غير مدعوم. استخدم csv أو json"}), 400
+        return json_response({"error": "نوع ملف غير مدعوم. استخدم csv أو json"}, 400)
     
     filename = f"analysis_{session_id}.{file_type}"
     filepath = os.path.join(UPLOAD_FOLDER, filename)
     
     if not os.path.exists(filepath):
-        return jsonify({"error": "الملف غير موجود أو انتهت صلاحيته"}), 404
+        return json_response({"error": "الملف غير موجود أو انتهت صلاحيته"}, 404)
     
     return send_file(filepath, as_attachment=True, download_name=filename)
 
@@ -520,12 +839,12 @@ def quick_analyze():
     """تحليل سريع - يُرجع فقط الملخص والعناصر المهمة"""
     
     if not request.is_json:
-        return jsonify({"success": False, "error": "يجب إرسال البيانات بصيغة JSON"}), 400
+        return json_response({"success": False, "error": "يجب إرسال البيانات بصيغة JSON"}, 400)
     
     data = request.get_json()
     
     if 'url' not in data:
-        return jsonify({"success": False, "error": "يجب تقديم رابط الصفحة (url)"}), 400
+        return json_response({"success": False, "error": "يجب تقديم رابط الصفحة (url)"}, 400)
     
     url = data['url'].strip()
     
@@ -533,7 +852,7 @@ def quick_analyze():
         result = analyzer.analyze_page_content(url)
         
         if not result['success']:
-            return jsonify(result), 500
+            return json_response(result, 500)
         
         analysis_data = result['data']
         
@@ -549,30 +868,73 @@ def quick_analyze():
             "elements_summary": analysis_data['elements_summary'],
             "interactive_elements": [
                 elem for elem in analysis_data['detailed_elements']
-                if elem['category']['primary_type'] == 'interactive'
+                if elem.category['primary_type'] == 'interactive'
             ][:10],  # أول 10 عناصر تفاعلية
             "important_headings": [
                 elem for elem in analysis_data['detailed_elements']
-                if elem['category'].get('importance') == 'high'
+                if elem.category.get('importance') == 'high'
             ][:5]  # أول 5 عناوين مهمة
         }
         
-        return jsonify({
+        return json_response({
             "success": True,
             "message": "تم التحليل السريع بنجاح",
             "data": quick_response
         })
         
     except Exception as e:
-        return jsonify({"success": False, "error": f"خطأ في التحليل: {str(e)}"}), 500
+        return json_response({"success": False, "error": f"خطأ في التحليل: {str(e)}"}, 500)
+
+@app.route('/analyze/bulk', methods=['POST'])
+def bulk_analyze():
+    """تحليل عدة صفحات في طلب واحد - تُحمّل الصفحات بالتوازي ثم تُحلل"""
+    
+    if not request.is_json:
+        return json_response({"success": False, "error": "يجب إرسال البيانات بصيغة JSON"}, 400)
+    
+    data = request.get_json()
+    urls = data.get('urls')
+    
+    if not isinstance(urls, list) or not urls:
+        return json_response({"success": False, "error": "يجب تقديم قائمة روابط (urls)"}, 400)
+    
+    if len(urls) > MAX_BULK_URLS:
+        return json_response({"success": False, "error": f"الحد الأقصى {MAX_BULK_URLS} رابطاً في الطلب الواحد"}, 400)
+    
+    urls = [str(url).strip() for url in urls]
+    invalid = [url for url in urls if not (url.startswith("http://") or url.startswith("https://"))]
+    if invalid:
+        return json_response({"success": False, "error": f"روابط غير صحيحة: {', '.join(invalid)}"}, 400)
+    
+    try:
+        fetched_pages = analyzer.run(analyzer.fetch_pages, urls)
+    except PlaywrightError as e:
+        return json_response({"success": False, "error": f"Playwright Error: {str(e)}"}, 500)
+    except Exception as e:
+        return json_response({"success": False, "error": f"خطأ في التحليل: {str(e)}"}, 500)
+    
+    results = {}
+    for url, fetched in zip(urls, fetched_pages):
+        if isinstance(fetched, PlaywrightError):
+            results[url] = {"success": False, "error": f"Playwright Error: {str(fetched)}"}
+        elif isinstance(fetched, Exception):
+            results[url] = {"success": False, "error": f"Unexpected Error: {str(fetched)}"}
+        else:
+            results[url] = analyzer.analyze_page_content(url, fetched=fetched)
+    
+    return json_response({
+        "success": True,
+        "message": f"تم تحليل {sum(1 for result in results.values() if result['success'])} من {len(urls)} صفحة",
+        "results": results
+    })
 
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({"error": "الصفحة غير موجودة"}), 404
+    return json_response({"error": "الصفحة غير موجودة"}, 404)
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({"error": "خطأ داخلي في الخادم"}), 500
+    return json_response({"error": "خطأ داخلي في الخادم"}, 500)
 
 if __name__ == '__main__':
     print("=" * 70)
@@ -584,6 +946,7 @@ if __name__ == '__main__':
     print("   GET  /health               - فحص حالة الخدمة")
     print("   POST /analyze              - تحليل صفحة ويب كامل")
     print("   POST /analyze/quick        - تحليل سريع")
+    print("   POST /analyze/bulk         - تحليل عدة صفحات معاً")
     print("   GET  /download/<type>/<id> - تحميل الملفات")
     print()
     print("--- ⚠️ تذكير مهم ---")
@@ -591,4 +954,11 @@ if __name__ == '__main__':
     print("chrome --remote-debugging-port=9222 --user-data-dir=/tmp/chrome-debug")
     print("=" * 70)
     
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    # بدون وضع التصحيح (لا مُعيد تحميل ولا مُصحح لكل طلب)، وكل طلب في خيط مستقل؛
+    # أوامر المتصفح تتوزع على PLAYWRIGHT_WORKERS خيطاً. للإنتاج يمكن استخدام خادم WSGI، مثلاً:
+    #   gunicorn -w 2 -k gthread --threads 4 enhanced_web_analyzer:app
+    # (بدون --preload: كل عامل يفتح اتصالات Playwright الخاصة به عند الحاجة)
+    try:
+        app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
+    finally:
+        analyzer.shutdown()
\ No newline at end of file
@@ -1,106 +1,306 @@
 from flask import Flask, request, jsonify
-from playwright.sync_api import sync_playwright
+from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 import json
+import re
 import threading
 import time
 import subprocess
+import sys
+import urllib.error
+import urllib.request
 import psutil
+import socket
+from concurrent.futures import ThreadPoolExecutor
 
 app = Flask(__name__)
 
+BROWSERS_INFO = [
+    {"name": "Chrome", "process_names": ["chrome.exe", "chrome", "google-chrome"], "debug_port": 9222},
+    {"name": "Edge", "process_names": ["msedge.exe", "msedge", "microsoft-edge"], "debug_port": 9222},
+    {"name": "Firefox", "process_names": ["firefox.exe", "firefox"], "debug_port": 6000}
+]
+
+# Lowercase executable name -> browser entry, so each process costs one dict lookup
+PROCESS_NAME_TO_BROWSER = {
+    process_name.lower(): browser
+    for browser in BROWSERS_INFO
+    for process_name in browser["process_names"]
+}
+
+# Seconds a browser check is reused before probing the debug ports again
+BROWSERS_CACHE_TTL = 2.0
+
+# Field kinds picked up by find_input_fields
+INPUT_SELECTORS = [
+    'input[type="text"]',
+    'input[type="email"]',
+    'input[type="password"]',
+    'input[type="search"]',
+    'input[type="url"]',
+    'input[type="tel"]',
+    'input[type="number"]',
+    'input:not([type])',  # input without specified type (defaults to text)
+    'textarea',
+    'input[type="date"]',
+    'input[type="time"]'
+]
+
+# One union selector, so the page is walked once and fields come back in document order.
+# Disabled and hidden fields are dropped later by FIELD_INFO_JS, against the bound handles.
+INPUT_SELECTOR = ", ".join(INPUT_SELECTORS)
+
+# Field classification rules, in priority order; the first matching rule wins.
+# A rule matches on an exact input type or tag, or when one of its keywords
+# appears in the lowercased type, placeholder, name or class.
+FIELD_RULES = [
+    ("search", "Search Box", {'type': ('search',), 'placeholder': ('search',), 'name': ('search',), 'class': ('search',)}),
+    ("email", "Email Input", {'type_is': ('email',), 'placeholder': ('email',), 'name': ('mail',), 'class': ('email',)}),
+    ("password", "Password Input", {'type_is': ('password',), 'placeholder': ('password',), 'name': ('pass',), 'class': ('password',)}),
+    ("url", "URL Input", {'type_is': ('url',), 'placeholder': ('url', 'website')}),
+    ("textarea", "Text Area", {'tag_is': ('textarea',)}),
+    ("phone", "Phone Number Input", {'type_is': ('tel',), 'placeholder': ('phone',), 'name': ('tel',)}),
+    ("number", "Number Input", {'type_is': ('number',), 'placeholder': ('number',)}),
+    ("date", "Date Input", {'type_is': ('date',)}),
+    ("time", "Time Input", {'type_is': ('time',)}),
+    ("name", "Name Input", {'placeholder': ('name',), 'name': ('name',)}),
+    ("username", "Username Input", {'placeholder': ('username',), 'name': ('username', 'user')}),
+    ("address", "Address Input", {'placeholder': ('address',), 'name': ('address',)}),
+    ("age", "Age Input", {'placeholder': ('age',), 'name': ('age',)}),
+    ("title", "Title Input", {'placeholder': ('title',), 'name': ('title',)}),
+]
+
+def _keyword_matcher(attribute):
+    """Build one regex for an attribute and the keyword -> rule index map"""
+    # The lookahead also reports overlapping keywords ('name' inside 'username'),
+    # and keywords are listed by rule priority so the best rule wins at each position
+    rule_of = {}
+    for index, (_, _, matchers) in enumerate(FIELD_RULES):
+        for keyword in matchers.get(attribute, ()):
+            rule_of.setdefault(keyword, index)
+    pattern = re.compile('(?=(' + '|'.join(map(re.escape, rule_of)) + '))')
+    return pattern, rule_of
+
+# Matchers for the type, placeholder, name and class, in that order
+FIELD_KEYWORD_MATCHERS = [_keyword_matcher(attribute) for attribute in ('type', 'placeholder', 'name', 'class')]
+
+# Exact input type / tag -> rule index
+FIELD_TYPE_RULES = {
+    value: index
+    for index, (_, _, matchers) in enumerate(FIELD_RULES)
+    for value in matchers.get('type_is', ())
+}
+FIELD_TAG_RULES = {
+    value: index
+    for index, (_, _, matchers) in enumerate(FIELD_RULES)
+    for value in matchers.get('tag_is', ())
+}
+
+# Display names for text areas, by keyword in placeholder or name
+TEXTAREA_DISPLAY_NAMES = [
+    ('comment', "Comments Box"),
+    ('message', "Message Box"),
+    ('description', "Description Box"),
+]
+
+# Runs over the handles from page.query_selector_all(INPUT_SELECTOR): returns
+# the attributes of every visible, enabled field, so discovery is a single round
+# trip instead of several calls per element. index is the position of the field
+# in that handle list, which stays bound to the same element while filling.
+FIELD_INFO_JS = """elements => elements.map((el, index) => {
+    const rect = el.getBoundingClientRect();
+    if (rect.width === 0 || rect.height === 0) return null;
+    if (getComputedStyle(el).visibility === 'hidden' || el.matches(':disabled')) return null;
+    return {
+        index,
+        tag: el.tagName.toLowerCase(),
+        type: el.getAttribute('type') || '',
+        placeholder: el.getAttribute('placeholder') || '',
+        name: el.getAttribute('name') || '',
+        id: el.getAttribute('id') || '',
+        class: el.getAttribute('class') || ''
+    };
+}).filter(field => field !== null)"""
+
+# Sets a field's value directly and fires the events form scripts listen for.
+# Frameworks that track the value setter themselves (e.g. React) may ignore it.
+SET_VALUE_JS = """(el, value) => {
+    el.focus();
+    el.value = value;
+    el.dispatchEvent(new Event('input', { bubbles: true }));
+    el.dispatchEvent(new Event('change', { bubbles: true }));
+}"""
+
+# Product prefixes reported by /json/version -> browser name
+BROWSER_PRODUCTS = [
+    ("Edg", "Edge"),
+    ("HeadlessChrome", "Chrome"),
+    ("Chrome", "Chrome"),
+    ("Firefox", "Firefox"),
+]
+
+# Debug endpoints tried by connect_to_existing_browser, in order of preference
+CDP_ENDPOINTS = [
+    (9222, "chromium"),  # Chrome/Edge use the same CDP protocol
+    (9223, "chromium"),
+    (9224, "chromium"),
+    (6000, "firefox"),
+]
+CDP_PROBE_TIMEOUT = 0.5
+PORT_CHECK_TIMEOUT = 0.05
+
+def port_open(port, timeout=PORT_CHECK_TIMEOUT):
+    """Cheap TCP check: is anything listening on localhost:port?"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        return sock.connect_ex(("127.0.0.1", port)) == 0
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+def cdp_endpoint_version(port):
+    """Return the /json/version info of the debug endpoint on localhost:port,
+    {} if something answers without it, or None if nothing answers"""
+    # A closed port is refused in well under a millisecond; skip the HTTP request
+    if not port_open(port):
+        return None
+    try:
+        with urllib.request.urlopen(f"http://localhost:{port}/json/version", timeout=CDP_PROBE_TIMEOUT) as response:
+            info = json.load(response)
+            return info if isinstance(info, dict) else {}
+    except urllib.error.HTTPError:
+        # Something is serving HTTP there; let connect_over_cdp decide
+        return {}
+    except ValueError:
+        return {}
+    except Exception:
+        return None
+
+def browser_for_product(product):
+    """Map a /json/version "Browser" value (e.g. "Chrome/120.0") to a BROWSERS_INFO entry"""
+    for prefix, name in BROWSER_PRODUCTS:
+        if product.startswith(prefix):
+            return next(browser for browser in BROWSERS_INFO if browser['name'] == name)
+    return None
+
 class FormFiller:
     def __init__(self):
         self.playwright = None
         self.browser = None
-        self.page = None
+        self.context = None
         self.current_session = None
         self.browser_type = None
+        self._browsers_cache = None
+        self._browsers_cache_ts = 0.0
+        # The sync Playwright API is bound to the thread that started it, so
+        # every browser call goes through this single worker thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='playwright')
     
-    def check_running_browsers(self):
+    def run(self, func, *args, **kwargs):
+        """Run func on the Playwright thread and return its result"""
+        return self._executor.submit(func, *args, **kwargs).result()
+    
+    def check_running_browsers(self, force=False):
         """Check if any supported browsers are running with debug port"""
-        browsers_info = [
-            {"name": "Chrome", "process_names": ["chrome.exe", "chrome", "google-chrome"], "debug_port": 9222},
-            {"name": "Edge", "process_names": ["msedge.exe", "msedge", "microsoft-edge"], "debug_port": 9222},
-            {"name": "Firefox", "process_names": ["firefox.exe", "firefox"], "debug_port": 6000}
-        ]
+        now = time.monotonic()
+        if not force and self._browsers_cache is not None and now - self._browsers_cache_ts < BROWSERS_CACHE_TTL:
+            return list(self._browsers_cache)
+        
+        # Ask the debug endpoints themselves: authoritative, and no /proc scan
+        with ThreadPoolExecutor(max_workers=len(CDP_ENDPOINTS)) as pool:
+            versions = list(pool.map(cdp_endpoint_version, [port for port, _ in CDP_ENDPOINTS]))
         
         running_browsers = []
+        for (port, browser_type), version in zip(CDP_ENDPOINTS, versions):
+            if version is None:
+                continue
+            product = version.get('Browser', '')
+            browser = browser_for_product(product)
+            if browser is None:
+                browser = {"name": product or browser_type, "process_names": []}
+            running_browsers.append({**browser, "debug_port": port, "version": product})
+        
+        self._browsers_cache = running_browsers
+        self._browsers_cache_ts = now
+        return list(self._browsers_cache)
+    
+    def find_debug_browser_processes(self):
+        """Browsers whose process was started with a debug port (diagnostics only)"""
+        found = set()
         
-        for browser in browsers_info:
-            for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-                try:
-                    if proc.info['name'] and any(name.lower() in proc.info['name'].lower() for name in browser['process_names']):
-                        cmdline = proc.info.get('cmdline', [])
-                        if cmdline and any('--remote-debugging-port' in str(arg) for arg in cmdline):
-                            running_browsers.append(browser)
-                            break
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        for proc in psutil.process_iter(['name']):
+            try:
+                proc_name = proc.info['name']
+                if not proc_name:
                     continue
-        
-        return running_browsers
+                browser = PROCESS_NAME_TO_BROWSER.get(proc_name.lower())
+                if browser is None or browser['name'] in found:
+                    continue
+                # Only read the command line of actual browser processes
+                cmdline = proc.cmdline()
+                if any(arg.startswith('--remote-debugging-port') for arg in cmdline):
+                    found.add(browser['name'])
+                    if len(found) == len(BROWSERS_INFO):
+                        break
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+        
+        return [browser for browser in BROWSERS_INFO if browser['name'] in found]
     
     def connect_to_existing_browser(self):
         """Try to connect to an existing browser with debugging enabled"""
         try:
-            self.playwright = sync_playwright().start()
+            # Started once and kept for the process lifetime
+            if self.playwright is None:
+                self.playwright = sync_playwright().start()
             
-            # Try Chrome/Edge first (they use the same CDP protocol)
-            cdp_ports = [9222, 9223, 9224]  # Common debug ports
+            # Probe every candidate port at once; the result is also cached for
+            # the report start_browser_connection prints when connecting fails
+            alive_ports = {browser['debug_port'] for browser in self.check_running_browsers(force=True)}
             
-            for port in cdp_ports:
+            # Connect in preference order (Chrome/Edge first, then Firefox);
+            # Playwright calls must stay on this thread, so this part is sequential
+            for port, browser_type in CDP_ENDPOINTS:
+                if port not in alive_ports:
+                    continue
                 try:
-                    # Try to connect via CDP (Chrome Debug Protocol)
-                    browser = self.playwright.chromium.connect_over_cdp(f"http://localhost:{port}")
+                    browser = getattr(self.playwright, browser_type).connect_over_cdp(f"http://localhost:{port}")
                     if browser:
                         self.browser = browser
-                        # Get existing page or create new one
+                        # Use the browser's existing context (the user's profile,
+                        # cookies and logins) or create one
                         contexts = self.browser.contexts
                         if contexts:
-                            pages = contexts[0].pages
-                            if pages:
-                                self.page = pages[0]
-                            else:
-                                self.page = contexts[0].new_page()
+                            self.context = contexts[0]
                         else:
-                            context = self.browser.new_context()
-                            self.page = context.new_page()
+                            self.context = self.browser.new_context()
                         
-                        print(f"✅ Successfully connected to existing browser on port {port}")
+                        if browser_type == "firefox":
+                            print("✅ Successfully connected to existing Firefox browser")
+                        else:
+                            print(f"✅ Successfully connected to existing browser on port {port}")
                         return True
                         
                 except Exception as e:
                     continue
             
-            # If CDP connection failed, try Firefox
-            try:
-                browser = self.playwright.firefox.connect_over_cdp("http://localhost:6000")
-                if browser:
-                    self.browser = browser
-                    contexts = self.browser.contexts
-                    if contexts:
-                        pages = contexts[0].pages
-                        if pages:
-                            self.page = pages[0]
-                        else:
-                            self.page = contexts[0].new_page()
-                    else:
-                        context = self.browser.new_context()
-                        self.page = context.new_page()
-                    
-                    print("✅ Successfully connected to existing Firefox browser")
-                    return True
-                    
-            except Exception as e:
-                pass
-            
             return False
             
         except Exception as e:
             print(f"❌ Error connecting to browser: {e}")
             return False
     
-    def start_browser_connection(self):
-        """Try to connect to existing browser or show instructions"""
+    def is_connected(self):
+        """Check whether the current browser connection is still usable"""
+        try:
+            return self.browser is not None and self.browser.is_connected()
+        except Exception:
+            return False
+    
+    def start_browser_connection(self, diagnose=False):
+        """Try to connect to existing browser or show instructions
+        (diagnose=True also scans the process list for debug-mode browsers)"""
         print("🔍 Checking for running browsers with debug mode...")
         
         # First try to connect directly
@@ -109,6 +309,13 @@ class FormFiller:
         
         # If no connection possible, show instructions
         print("\n❌ No browser found with debugging enabled!")
+        for browser in self.check_running_browsers():
+            print(f"⚠️  {browser['name']} answers on port {browser['debug_port']}, but the connection failed")
+        # Walking every process is slow, so it only runs when asked for
+        if diagnose:
+            for browser in self.find_debug_browser_processes():
+                ports = ", ".join(str(port) for port, _ in CDP_ENDPOINTS)
+                print(f"⚠️  {browser['name']} is running with --remote-debugging-port, but no debug endpoint answered on ports {ports}")
         print("\n📋 Please start one of the following browsers with debug mode:")
         print("\n🌐 For Chrome:")
         print("   Windows: chrome.exe --remote-debugging-port=9222")
@@ -129,12 +336,10 @@ class FormFiller:
             if self.browser:
                 # Don't close the actual browser, just disconnect
                 print("🔌 Disconnecting from browser...")
+                browser = self.browser
                 self.browser = None
-                self.page = None
-                
-            if self.playwright:
-                self.playwright.stop()
-                self.playwright = None
+                self.context = None
+                browser.close()
                 
             print("✅ Browser connection closed successfully")
             return True
@@ -143,116 +348,91 @@ class FormFiller:
             print(f"❌ Error closing browser connection: {e}")
             return False
     
-    def navigate_to_url(self, url):
+    def shutdown(self):
+        """Disconnect from the browser and stop Playwright (on process exit)"""
+        def stop():
+            self.close_browser_connection()
+            if self.playwright:
+                self.playwright.stop()
+                self.playwright = None
+        self.run(stop)
+        self._executor.shutdown()
+    
+    def new_page(self):
+        """Open a tab for a single request, so requests never share page state"""
+        return self.context.new_page()
+    
+    def navigate_to_url(self, page, url):
         """Navigate to the requested URL"""
         try:
             print(f"🌐 Navigating to: {url}")
-            self.page.goto(url, wait_until='networkidle', timeout=30000)
+            # Only the DOM is needed to find fields; networkidle can take the
+            # full timeout on pages with analytics beacons or long polling
+            page.goto(url, wait_until='domcontentloaded', timeout=15000)
+            try:
+                # Give client-side rendered forms a moment to appear
+                page.wait_for_selector('input, textarea', timeout=5000)
+            except PlaywrightTimeoutError:
+                pass
             print("✅ Page loaded successfully")
             return True
         except Exception as e:
             print(f"❌ Error loading page: {e}")
             return False
     
-    def find_input_fields(self):
+    def find_input_fields(self, page):
         """Find all input fields on the page"""
         input_fields = []
         
-        # Search for different types of input fields
-        selectors = [
-            'input[type="text"]',
-            'input[type="email"]', 
-            'input[type="password"]',
-            'input[type="search"]',
-            'input[type="url"]',
-            'input[type="tel"]',
-            'input[type="number"]',
-            'input:not([type])',  # input without specified type (defaults to text)
-            'textarea',
-            'input[type="date"]',
-            'input[type="time"]'
-        ]
-        
-        for selector in selectors:
-            try:
-                elements = self.page.query_selector_all(selector)
-                for element in elements:
-                    # Check if element is visible and interactive
-                    if element.is_visible() and element.is_enabled():
-                        field_info = self.get_field_info(element, selector)
-                        if field_info:
-                            input_fields.append(field_info)
-            except Exception as e:
-                print(f"❌ Error searching for elements {selector}: {e}")
+        # One round trip collects every visible, enabled field and its attributes
+        try:
+            handles = page.query_selector_all(INPUT_SELECTOR)
+            fields = page.evaluate(FIELD_INFO_JS, handles)
+        except Exception as e:
+            print(f"❌ Error searching for input fields: {e}")
+            return input_fields
+        
+        for info in fields:
+            field_info = self.get_field_info(handles[info['index']], info)
+            if field_info:
+                input_fields.append(field_info)
         
         return input_fields
     
-    def get_field_info(self, element, selector):
+    def get_field_info(self, element, info):
         """Get field information"""
         try:
             field_type = "text"
             field_display_name = "Text Input"
-            placeholder = element.get_attribute('placeholder') or ""
-            name = element.get_attribute('name') or ""
-            field_id = element.get_attribute('id') or ""
-            field_class = element.get_attribute('class') or ""
+            placeholder = info['placeholder']
+            name = info['name']
+            field_id = info['id']
+            field_class = info['class']
             
             # Determine field type based on attributes
-            input_type = element.get_attribute('type') or "text"
+            input_type = info['type'] or "text"
             
-            # Advanced field type detection with display names
-            if 'search' in input_type.lower() or 'search' in placeholder.lower() or 'search' in name.lower() or 'search' in field_class.lower():
-                field_type = "search"
-                field_display_name = "Search Box"
-            elif input_type == 'email' or 'email' in placeholder.lower() or 'mail' in name.lower() or 'email' in field_class.lower():
-                field_type = "email"
-                field_display_name = "Email Input"
-            elif input_type == 'password' or 'password' in placeholder.lower() or 'pass' in name.lower() or 'password' in field_class.lower():
-                field_type = "password"
-                field_display_name = "Password Input"
-            elif input_type == 'url' or 'url' in placeholder.lower() or 'website' in placeholder.lower():
-                field_type = "url"
-                field_display_name = "URL Input"
-            elif selector == 'textarea' or element.tag_name.lower() == 'textarea':
-                field_type = "textarea"
-                if 'comment' in placeholder.lower() or 'comment' in name.lower():
-                    field_display_name = "Comments Box"
-                elif 'message' in placeholder.lower() or 'message' in name.lower():
-                    field_display_name = "Message Box"
-                elif 'description' in placeholder.lower() or 'description' in name.lower():
-                    field_display_name = "Description Box"
-                else:
-                    field_display_name = "Text Area"
-            elif input_type == 'tel' or 'phone' in placeholder.lower() or 'tel' in name.lower():
-                field_type = "phone"
-                field_display_name = "Phone Number Input"
-            elif input_type == 'number' or 'number' in placeholder.lower():
-                field_type = "number"
-                field_display_name = "Number Input"
-            elif input_type == 'date':
-                field_type = "date"
-                field_display_name = "Date Input"
-            elif input_type == 'time':
-                field_type = "time"
-                field_display_name = "Time Input"
-            elif 'name' in placeholder.lower() or 'name' in name.lower():
-                field_type = "name"
-                field_display_name = "Name Input"
-            elif 'username' in placeholder.lower() or 'username' in name.lower() or 'user' in name.lower():
-                field_type = "username"
-                field_display_name = "Username Input"
-            elif 'address' in placeholder.lower() or 'address' in name.lower():
-                field_type = "address"
-                field_display_name = "Address Input"
-            elif 'age' in placeholder.lower() or 'age' in name.lower():
-                field_type = "age"
-                field_display_name = "Age Input"
-            elif 'title' in placeholder.lower() or 'title' in name.lower():
-                field_type = "title"
-                field_display_name = "Title Input"
-            else:
-                field_type = "text"
-                field_display_name = "Text Input"
+            # Advanced field type detection with display names:
+            # each attribute is lowercased and scanned by a single regex
+            t = input_type.lower()
+            p = placeholder.lower()
+            n = name.lower()
+            c = field_class.lower()
+            
+            no_match = len(FIELD_RULES)
+            best = min(FIELD_TYPE_RULES.get(t, no_match), FIELD_TAG_RULES.get(info['tag'], no_match))
+            for value, (pattern, rule_of) in zip((t, p, n, c), FIELD_KEYWORD_MATCHERS):
+                for match in pattern.finditer(value):
+                    best = min(best, rule_of[match.group(1)])
+            if best < no_match:
+                field_type, field_display_name, _ = FIELD_RULES[best]
+            
+            if field_type == "textarea":
+                field_display_name = "Text Area"
+                for keyword, display_name in TEXTAREA_DISPLAY_NAMES:
+                    if keyword in p or keyword in n:
+                        field_display_name = display_name
+                        break
             
             return {
                 'element': element,
@@ -268,17 +448,27 @@ class FormFiller:
             print(f"❌ Error getting field information: {e}")
             return None
     
-    def fill_field(self, element, value, field_type):
+    def fill_field(self, element, value, field_type, simulate_typing=False, fast=False):
         """Fill field with the requested value"""
         try:
-            # Focus on the field first
-            element.click()
-            
-            # Clear current content
-            element.fill("")
+            if fast:
+                # Set the value in one script call, skipping Playwright's actionability
+                # checks; fall back to fill() if the script fails
+                try:
+                    element.evaluate(SET_VALUE_JS, value)
+                    print(f"✅ Successfully filled {field_type} field with: {value}")
+                    return True
+                except Exception:
+                    pass
             
-            # Type new value
-            element.type(value, delay=100)  # delay for natural simulation
+            if simulate_typing:
+                # Focus, clear, then type key by key for natural simulation
+                element.click()
+                element.fill("")
+                element.type(value, delay=100)
+            else:
+                # fill() focuses, clears and sets the value in a single call
+                element.fill(value)
             
             print(f"✅ Successfully filled {field_type} field with: {value}")
             return True
@@ -287,18 +477,76 @@ class FormFiller:
             print(f"❌ Error filling field: {e}")
             return False
     
+    def batch_fill_form(self, url, values, fast=False, keep_open=False):
+        """Fill form from a mapping of field name / id / type to value (no prompts)"""
+        print(f"🌐 Loading page: {url}")
+        
+        # The tab is closed when done, so repeated API calls don't pile up tabs in
+        # the user's browser; keep_open leaves it for the user to review and submit
+        page = self.new_page()
+        
+        try:
+            if not self.navigate_to_url(page, url):
+                return {"success": False, "message": "Failed to load page"}
+            
+            input_fields = self.find_input_fields(page)
+            
+            if not input_fields:
+                print("❌ No input fields found on this page")
+                return {"success": False, "message": "No input fields found"}
+            
+            filled_fields = 0
+            skipped_fields = 0
+            
+            for field in input_fields:
+                # Most specific key first: name, then id, then detected field type
+                value = None
+                for key in (field['name'], field['id'], field['type']):
+                    if key and key in values:
+                        value = values[key]
+                        break
+                
+                if value is None or value == "":
+                    skipped_fields += 1
+                    continue
+                
+                if self.fill_field(field['element'], str(value), field['display_name'], fast=fast):
+                    filled_fields += 1
+                else:
+                    print(f"⚠️  Failed to fill {field['display_name']} field")
+            
+            print(f"📊 Filled {filled_fields} of {len(input_fields)} field(s)")
+            
+            return {
+                "success": True,
+                "message": "Form filling completed",
+                "stats": {
+                    "total_fields": len(input_fields),
+                    "filled_fields": filled_fields,
+                    "skipped_fields": skipped_fields
+                }
+            }
+        finally:
+            if not keep_open:
+                page.close()
+    
     def interactive_fill_form(self, url):
-        """Fill form interactively"""
+        """Fill form interactively (command line use only: prompts on stdin)"""
         print(f"🌐 Loading page: {url}")
         
-        if not self.navigate_to_url(url):
+        # The tab stays open after filling so the user can review and submit the form
+        page = self.new_page()
+        
+        if not self.navigate_to_url(page, url):
+            page.close()
             return {"success": False, "message": "Failed to load page"}
         
         print("🔍 Searching for input fields...")
-        input_fields = self.find_input_fields()
+        input_fields = self.find_input_fields(page)
         
         if not input_fields:
             print("❌ No input fields found on this page")
+            page.close()
             return {"success": False, "message": "No input fields found"}
         
         print(f"✅ Found {len(input_fields)} input field(s)")
@@ -324,7 +572,6 @@ class FormFiller:
                 success = self.fill_field(field['element'], user_input, field['display_name'])
                 if success:
                     filled_fields += 1
-                    time.sleep(0.5)  # short pause for page processing
                 else:
                     print(f"⚠️  Failed to fill {field['display_name']} field")
             else:
@@ -390,10 +637,19 @@ form_filler = FormFiller()
 def start_session():
     """Start new session"""
     try:
-        if form_filler.browser:
-            form_filler.close_browser_connection()
+        data = request.get_json(silent=True) or {}
+        diagnose = bool(data.get('diagnose'))
         
-        success = form_filler.start_browser_connection()
+        # A healthy connection is reused instead of being torn down and rebuilt
+        if form_filler.run(form_filler.is_connected):
+            return jsonify({"success": True, "message": "Session already active"})
+        
+        def reconnect():
+            if form_filler.browser:
+                form_filler.close_browser_connection()
+            return form_filler.start_browser_connection(diagnose=diagnose)
+        
+        success = form_filler.run(reconnect)
         if success:
             return jsonify({"success": True, "message": "Session started successfully"})
         else:
@@ -407,19 +663,21 @@ def fill_form():
     try:
         data = request.json
         url = data.get('url')
+        values = data.get('values')
         
         if not url:
             return jsonify({"success": False, "message": "Please provide page URL"})
         
+        if not isinstance(values, dict) or not values:
+            return jsonify({"success": False, "message": "Please provide values to fill (field name, id or type -> value)"})
+        
         if not form_filler.browser:
             return jsonify({"success": False, "message": "Please start session first"})
         
-        # Run form filler in separate thread to allow interaction
-        def run_form_filler():
-            result = form_filler.interactive_fill_form(url)
-            return result
-        
-        result = run_form_filler()
+        result = form_filler.run(
+            form_filler.batch_fill_form, url, values,
+            fast=bool(data.get('fast')), keep_open=bool(data.get('keep_open'))
+        )
         return jsonify(result)
         
     except Exception as e:
@@ -429,7 +687,7 @@ def fill_form():
 def close_session():
     """End session and close browser connection"""
     try:
-        form_filler.close_browser_connection()
+        form_filler.run(form_filler.close_browser_connection)
         return jsonify({"success": True, "message": "Session closed successfully"})
     except Exception as e:
         return jsonify({"success": False, "message": f"Error: {str(e)}"})
@@ -447,11 +705,20 @@ def get_fields():
         if not form_filler.browser:
             return jsonify({"success": False, "message": "Please start session first"})
         
-        if not form_filler.navigate_to_url(url):
+        # Each request works in its own tab, closed once the fields are read
+        def collect_fields():
+            page = form_filler.new_page()
+            try:
+                if not form_filler.navigate_to_url(page, url):
+                    return None
+                return form_filler.find_input_fields(page)
+            finally:
+                page.close()
+        
+        input_fields = form_filler.run(collect_fields)
+        if input_fields is None:
             return jsonify({"success": False, "message": "Failed to load page"})
         
-        input_fields = form_filler.find_input_fields()
-        
         fields_info = []
         for field in input_fields:
             fields_info.append({
@@ -472,16 +739,28 @@ def get_fields():
         return jsonify({"success": False, "message": f"Error: {str(e)}"})
 
 if __name__ == '__main__':
+    # Interactive command line mode: python playwright_form_filler.py <url>
+    if len(sys.argv) > 1:
+        try:
+            if form_filler.run(form_filler.start_browser_connection, diagnose=True):
+                form_filler.run(form_filler.interactive_fill_form, sys.argv[1])
+        finally:
+            form_filler.shutdown()
+        sys.exit(0)
+    
     print("🚀 Starting Form Filler API")
     print("📋 Available endpoints:")
-    print("   POST /start_session - Start new session")
-    print("   POST /fill_form - Fill form (requires url in JSON)")
+    print("   POST /start_session - Start new session (optional diagnose: scan processes on failure)")
+    print("   POST /fill_form - Fill form (requires url and values in JSON; optional keep_open)")
     print("   POST /get_fields - Get field list (requires url in JSON)")
     print("   POST /close_session - End session")
     print("-" * 60)
     
+    # No debug reloader; each request gets its own thread. Behind a WSGI server
+    # keep a single worker, since the browser session lives in process memory:
+    #   gunicorn -w 1 -k gthread --threads 8 playwright_form_filler:app
     try:
-        app.run(debug=True, host='0.0.0.0', port=5000)
+        app.run(debug=False, threaded=True, host='0.0.0.0', port=5000)
     finally:
-        # Make sure to close browser connection on app exit
-        form_filler.close_browser_connection()
\ No newline at end of file
+        # Make sure to close browser connection and stop Playwright on app exit
+        form_filler.shutdown()
\ No newline at end of file